@@ -0,0 +1,44 @@
+"""
+Optional Numba support.
+
+Numeric kernels in analysis.py are decorated with `njit`. When numba is not
+installed the decorator becomes a no-op and `prange` falls back to `range`,
+so the module still imports and runs (as plain Python, just slower).
+
+Kernels compiled with parallel=True must be called under PARALLEL_LOCK:
+analyze_stocks runs tickers on a thread pool, and numba's default
+workqueue threading layer aborts if two threads enter a parallel region
+at the same time. Parallel kernels are therefore serialized across
+threads; the parallelism is within one call (over DFA scales or shuffles).
+
+Call launch_threads() from the main thread before handing kernels to a
+thread pool (warm_up and analyze_stocks do): if numba's worker pool is
+first started from a pool thread, its threads keep the interpreter from
+exiting.
+"""
+
+import threading
+
+PARALLEL_LOCK = threading.Lock()
+
+try:
+    from numba import njit, prange, get_num_threads
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # Support both bare @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+def launch_threads():
+    """Start numba's parallel worker pool from this thread (idempotent)."""
+    if HAVE_NUMBA:
+        get_num_threads()  # launches the pool on first use
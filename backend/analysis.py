@@ -1,21 +1,211 @@
-import yfinance as yf
 import numpy as np
-from statsmodels.stats.diagnostic import acorr_ljungbox
-from statsmodels.tsa.stattools import adfuller
 import pandas as pd
+import math
+import os
+import re
+import json
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import compress, repeat
+from functools import lru_cache
+from _njit import njit, prange, HAVE_NUMBA, PARALLEL_LOCK, launch_threads
+
+_NUMBER_SCALES = (1.0, 1e3, 1e6, 1e9, 1e12)
+_NUMBER_SUFFIXES = ('', 'K', 'M', 'B', 'T')
+
 
 def format_number(num):
     num = float(num)
-    if abs(num) >= 1e12:
-        return f'{num/1e12:.2f}T'
-    elif abs(num) >= 1e9:
-        return f'{num/1e9:.2f}B'
-    elif abs(num) >= 1e6:
-        return f'{num/1e6:.2f}M'
-    elif abs(num) >= 1e3:
-        return f'{num/1e3:.2f}K'
-    else:
+    n = abs(num)
+    if not n >= 1e3:  # small values (and NaN) are printed as-is
         return f'{num}'
+    
+    # Suffix index from the decimal exponent; the check guards log10 rounding
+    # just below a power of 1000
+    idx = 4 if n >= 1e12 else int(math.log10(n)) // 3
+    if n < _NUMBER_SCALES[idx]:
+        idx -= 1
+    return f'{num/_NUMBER_SCALES[idx]:.2f}{_NUMBER_SUFFIXES[idx]}'
+
+
+@njit(cache=True, fastmath=True)
+def _dfa_profile(series):
+    """
+    Integrated, mean-centered profile of `series` (cumulative sum of
+    deviations). Accumulates in float64, so float32 input is fine.
+    """
+    N = series.shape[0]
+    total = 0.0
+    for i in range(N):
+        total += series[i]
+    mean = total / N
+    y = np.empty(N, dtype=np.float64)
+    acc = 0.0
+    for i in range(N):
+        acc += series[i] - mean
+        y[i] = acc
+    return y
+
+
+@njit(cache=True, fastmath=True)
+def _dfa_scale_fluctuation(y, box_size):
+    """
+    DFA fluctuation F(s) of profile y for a single box size.
+    
+    For every box (forward pass from the start, backward pass from the end)
+    a linear trend is removed via the closed-form least-squares fit on
+    x = 0..s-1, using scalar accumulators instead of per-box polyfit/polyval
+    temporaries. Returns NaN where F is undefined.
+    """
+    N = y.shape[0]
+    n_boxes = N // box_size
+    if n_boxes < 2:
+        return np.nan
+    
+    x_mean = (box_size - 1) / 2.0
+    sxx = box_size * (box_size * box_size - 1) / 12.0
+    
+    ms_total = 0.0
+    for b in range(2 * n_boxes):
+        # Forward boxes first, then backward boxes anchored at the end
+        if b < n_boxes:
+            start = b * box_size
+        else:
+            start = N - (b - n_boxes + 1) * box_size
+        
+        # Pass 1: segment mean
+        y_sum = 0.0
+        for j in range(box_size):
+            y_sum += y[start + j]
+        y_mean = y_sum / box_size
+        
+        # Pass 2: covariance with x -> slope
+        sxy = 0.0
+        for j in range(box_size):
+            sxy += (j - x_mean) * (y[start + j] - y_mean)
+        slope = sxy / sxx
+        
+        # Pass 3: residual sum of squares around the fitted line
+        ss = 0.0
+        for j in range(box_size):
+            resid = (y[start + j] - y_mean) - slope * (j - x_mean)
+            ss += resid * resid
+        ms_total += ss / box_size
+    
+    F = math.sqrt(ms_total / (2 * n_boxes))
+    return F if F > 0 else np.nan
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _dfa_fluctuations(series, scales):
+    """
+    DFA fluctuation F(s) for each box size in `scales` (nopython kernel).
+    
+    Scales are independent, so the loop runs in parallel (prange);
+    call it under PARALLEL_LOCK.
+    
+    Returns a float64 array aligned with `scales` (NaN where F is undefined).
+    """
+    y = _dfa_profile(series)
+    out = np.empty(scales.shape[0], dtype=np.float64)
+    for s_idx in prange(scales.shape[0]):
+        out[s_idx] = _dfa_scale_fluctuation(y, scales[s_idx])
+    return out
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _dfa_fluctuations_batch(series_matrix, scales):
+    """
+    _dfa_fluctuations for every row of a (B, N) matrix in one call.
+    
+    Rows (e.g. the shuffled baseline copies) run in parallel, each one
+    serially over scales; call it under PARALLEL_LOCK.
+    
+    Returns a (B, len(scales)) float64 array.
+    """
+    B = series_matrix.shape[0]
+    out = np.empty((B, scales.shape[0]), dtype=np.float64)
+    for r in prange(B):
+        y = _dfa_profile(series_matrix[r])
+        for s_idx in range(scales.shape[0]):
+            out[r, s_idx] = _dfa_scale_fluctuation(y, scales[s_idx])
+    return out
+
+
+def _dfa_fluctuations_np(y, scales):
+    """
+    Vectorized NumPy equivalent of _dfa_fluctuations (used without numba).
+    Takes the already integrated profile y rather than the raw series:
+    either one profile of length N, or a (B, N) stack of profiles (e.g. the
+    shuffled baseline), which are all processed together.
+    
+    Each scale reshapes the forward and backward boxes into one
+    (B, 2 * n_boxes, box_size) tensor and detrends every box at once with
+    the closed-form least-squares slope (normal equations on x = 0..s-1).
+    
+    Returns F with shape (len(scales),) or (B, len(scales)).
+    """
+    single = y.ndim == 1
+    Y = np.atleast_2d(y)
+    B, N = Y.shape
+    out = np.empty((B, len(scales)), dtype=np.float64)
+    
+    for s_idx, box_size in enumerate(scales):
+        n_boxes = N // box_size
+        if n_boxes < 2:
+            out[:, s_idx] = np.nan
+            continue
+        
+        span = n_boxes * box_size
+        segments = np.concatenate((
+            Y[:, :span].reshape(B, n_boxes, box_size),
+            Y[:, N - span:].reshape(B, n_boxes, box_size),
+        ), axis=1)
+        
+        xc = np.arange(box_size) - (box_size - 1) / 2.0
+        sxx = box_size * (box_size * box_size - 1) / 12.0
+        centered = segments - segments.mean(axis=2, keepdims=True)
+        slope = (centered @ xc) / sxx
+        
+        rms2 = np.mean((centered - slope[..., None] * xc) ** 2, axis=2)
+        F = np.sqrt(np.mean(rms2, axis=1))
+        out[:, s_idx] = np.where(F > 0, F, np.nan)
+    
+    return out[0] if single else out
+
+
+@lru_cache(maxsize=64)
+def _dfa_scales(N, min_box, max_box, num_scales):
+    """
+    Log-spaced DFA box sizes (capped at N // 2) and their logs.
+    Depends only on the series length and parameters, so it is cached
+    across the train / test / shuffled-baseline calls.
+    """
+    scales = np.unique(
+        np.logspace(np.log10(min_box), np.log10(max_box), num=num_scales).astype(int)
+    )
+    scales = scales[scales <= N // 2]
+    log_scales = np.log(scales.astype(float))
+    scales.flags.writeable = False
+    log_scales.flags.writeable = False
+    return scales, log_scales
+
+
+def _as_float_array(series):
+    """
+    Contiguous floating-point array for the DFA kernels, converted once up
+    front. float32 input is kept (the kernels accumulate in float64);
+    anything else becomes float64, so no kernel sees int/object data.
+    """
+    arr = np.asarray(series)
+    if arr.dtype != np.float32:
+        arr = arr.astype(np.float64, copy=False)
+    return np.ascontiguousarray(arr)
 
 
 def dfa_hurst(series, min_box=10, max_box=None, num_scales=20):
@@ -33,6 +223,7 @@ def dfa_hurst(series, min_box=10, max_box=None, num_scales=20):
     - fluctuations: DFA fluctuation at each scale
     - poly: polynomial fit coefficients
     """
+    series = _as_float_array(series)
     N = len(series)
     if max_box is None:
         max_box = N // 4  # Use at most 1/4 of series length
@@ -40,91 +231,95 @@ def dfa_hurst(series, min_box=10, max_box=None, num_scales=20):
     if max_box <= min_box or N < min_box * 4:
         return np.nan, None, None, None
     
-    # Step 1: Integrate the mean-centered series (cumulative sum of deviations)
-    y = np.cumsum(series - np.mean(series))
-    
-    # Step 2: Generate logarithmically spaced box sizes
-    scales = np.unique(
-        np.logspace(np.log10(min_box), np.log10(max_box), num=num_scales).astype(int)
-    )
-    # Filter out scales that are too large
-    scales = scales[scales <= N // 2]
+    # Step 1: Logarithmically spaced box sizes (cached per N / parameters)
+    scales, log_scales = _dfa_scales(N, min_box, max_box, num_scales)
     
     if len(scales) < 4:
         return np.nan, None, None, None
     
-    fluctuations = []
-    
-    for box_size in scales:
-        # Number of non-overlapping boxes
-        n_boxes = N // box_size
-        if n_boxes < 2:
-            continue
-        
-        rms_values = []
-        
-        # Forward pass
-        for i in range(n_boxes):
-            start = i * box_size
-            end = start + box_size
-            segment = y[start:end]
-            
-            # Fit linear trend to segment
-            x = np.arange(box_size)
-            coeffs = np.polyfit(x, segment, 1)
-            trend = np.polyval(coeffs, x)
-            
-            # Calculate RMS of detrended segment
-            rms = np.sqrt(np.mean((segment - trend) ** 2))
-            rms_values.append(rms)
-        
-        # Backward pass (use remaining data from the end)
-        for i in range(n_boxes):
-            start = N - (i + 1) * box_size
-            end = start + box_size
-            if start < 0:
-                break
-            segment = y[start:end]
-            
-            x = np.arange(box_size)
-            coeffs = np.polyfit(x, segment, 1)
-            trend = np.polyval(coeffs, x)
-            
-            rms = np.sqrt(np.mean((segment - trend) ** 2))
-            rms_values.append(rms)
-        
-        if len(rms_values) > 0:
-            # Overall fluctuation for this scale
-            F = np.sqrt(np.mean(np.array(rms_values) ** 2))
-            if F > 0:
-                fluctuations.append(F)
-            else:
-                fluctuations.append(np.nan)
-        else:
-            fluctuations.append(np.nan)
-    
-    # Trim scales to match valid fluctuations
-    scales = scales[:len(fluctuations)]
-    fluctuations = np.array(fluctuations)
+    # Step 2: Integrate the mean-centered series (cumulative sum of
+    # deviations, accumulated in float64 even when the input is float32)
+    # and detrend every box. The numba kernel does both in one call.
+    if HAVE_NUMBA:
+        with PARALLEL_LOCK:
+            fluctuations = _dfa_fluctuations(series, scales)
+    else:
+        y = np.cumsum(series - np.mean(series, dtype=np.float64), dtype=np.float64)
+        fluctuations = _dfa_fluctuations_np(y, scales)
     
+    return _dfa_loglog_fit(scales, log_scales, fluctuations)
+
+
+def _dfa_loglog_fit(scales, log_scales, fluctuations):
+    """
+    Step 3 of dfa_hurst: drop invalid scales and fit log F(s) against log s.
+    Returns: H, scales, fluctuations, poly
+    """
     # Remove NaN entries
     valid = ~np.isnan(fluctuations) & (fluctuations > 0)
     scales = scales[valid]
+    log_scales = log_scales[valid]
     fluctuations = fluctuations[valid]
     
     if len(scales) < 4:
         return np.nan, None, None, None
     
     # Step 3: Log-log fit to get Hurst exponent
-    log_scales = np.log(scales.astype(float))
+    # Closed-form degree-1 least squares (same result as np.polyfit, no SVD)
     log_fluct = np.log(fluctuations)
-    
-    poly = np.polyfit(log_scales, log_fluct, 1)
-    H = poly[0]
+    mx = log_scales.mean()
+    my = log_fluct.mean()
+    dx = log_scales - mx
+    H = float(np.dot(dx, log_fluct - my) / np.dot(dx, dx))
+    poly = np.array([H, my - H * mx])
     
     return H, scales, fluctuations, poly
 
 
+def dfa_hurst_batch(series_matrix, min_box=10, max_box=None, num_scales=20):
+    """
+    dfa_hurst for every row of a (B, N) matrix, e.g. a stack of shuffled
+    copies of one series. With numba all rows go through one parallel
+    kernel call.
+    
+    Returns: array of B Hurst exponents (NaN where undefined)
+    """
+    series_matrix = _as_float_array(series_matrix)
+    B, N = series_matrix.shape
+    H_all = np.full(B, np.nan)
+    if max_box is None:
+        max_box = N // 4
+    
+    if B == 0 or max_box <= min_box or N < min_box * 4:
+        return H_all
+    
+    scales, log_scales = _dfa_scales(N, min_box, max_box, num_scales)
+    if len(scales) < 4:
+        return H_all
+    
+    if HAVE_NUMBA:
+        with PARALLEL_LOCK:
+            fluct_matrix = _dfa_fluctuations_batch(series_matrix, scales)
+    else:
+        Y = np.cumsum(
+            series_matrix - series_matrix.mean(axis=1, dtype=np.float64, keepdims=True),
+            axis=1, dtype=np.float64,
+        )
+        fluct_matrix = _dfa_fluctuations_np(Y, scales)
+    
+    valid = ~np.isnan(fluct_matrix) & (fluct_matrix > 0)
+    if valid.all():
+        # Common case: same scales for every row, so one least-squares
+        # solve for all B slopes
+        log_fluct = np.log(fluct_matrix)
+        dx = log_scales - log_scales.mean()
+        H_all = (log_fluct - log_fluct.mean(axis=1, keepdims=True)) @ dx / np.dot(dx, dx)
+    else:
+        for r in range(B):
+            H_all[r] = _dfa_loglog_fit(scales, log_scales, fluct_matrix[r])[0]
+    return H_all
+
+
 def hurst_with_baseline(series, n_shuffles=50, **kwargs):
     """
     Compute DFA Hurst exponent with shuffled baseline comparison.
@@ -139,21 +334,23 @@ def hurst_with_baseline(series, n_shuffles=50, **kwargs):
     - H_shuffled_std: std of shuffled Hurst values
     - is_significant: True if |H - 0.5| is statistically distinguishable from random
     """
+    series = _as_float_array(series)
+    
     # Real Hurst
     H, scales, fluctuations, poly = dfa_hurst(series, **kwargs)
     
     if np.isnan(H):
         return H, np.nan, np.nan, False, None, None, None
     
-    # Shuffled baseline
-    shuffled_hursts = []
+    # Shuffled baseline: all permutations drawn up front (same sequence as
+    # drawing them one at a time), then scored in a single batch call
     rng = np.random.default_rng(42)  # Reproducible
+    shuffled = np.empty((n_shuffles, len(series)), dtype=series.dtype)
+    for i in range(n_shuffles):
+        shuffled[i] = rng.permutation(series)
     
-    for _ in range(n_shuffles):
-        shuffled = rng.permutation(series)
-        H_shuf, _, _, _ = dfa_hurst(shuffled, **kwargs)
-        if not np.isnan(H_shuf):
-            shuffled_hursts.append(H_shuf)
+    shuffled_hursts = dfa_hurst_batch(shuffled, **kwargs)
+    shuffled_hursts = shuffled_hursts[~np.isnan(shuffled_hursts)]
     
     if len(shuffled_hursts) < 10:
         # Not enough valid shuffles — can't assess significance
@@ -172,6 +369,74 @@ def hurst_with_baseline(series, n_shuffles=50, **kwargs):
     return H, H_shuf_mean, H_shuf_std, is_significant, scales, fluctuations, poly
 
 
+def _lag1_corr(x):
+    """
+    Pearson correlation between x[:-1] and x[1:] (lag-1 autocorrelation).
+    
+    Computed from centered dot products on views of x, without the stacked
+    copy and 2x2 matrix np.corrcoef builds. Returns NaN if either side is
+    constant.
+    """
+    a = x[:-1]
+    b = x[1:]
+    da = a - a.mean()
+    db = b - b.mean()
+    den = np.sqrt((da @ da) * (db @ db))
+    if not den > 0:
+        return np.nan
+    return (da @ db) / den
+
+
+def ljung_box_pvalue(x, lags=10):
+    """
+    Ljung-Box p-value at `lags`, same statistic as statsmodels'
+    acorr_ljungbox but with the autocorrelations from one FFT
+    (O(N log N)) instead of per-lag products.
+    """
+    from scipy.stats import chi2
+    
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x.mean()
+    n = len(x)
+    
+    # Zero-pad to >= 2n - 1 so the circular correlation equals the linear one
+    nfft = 1 << (2 * n - 1).bit_length()
+    f = np.fft.rfft(x, n=nfft)
+    acov = np.fft.irfft(f * np.conj(f), n=nfft)[:lags + 1]
+    acf = acov[1:] / acov[0]
+    
+    q = n * (n + 2) * np.sum(acf ** 2 / (n - np.arange(1, lags + 1)))
+    return float(chi2.sf(q, lags))
+
+
+# ADF only feeds an informational p-value; the last ~2 years are plenty
+ADF_WINDOW = 500
+
+
+def adf_pvalue(close):
+    """
+    ADF unit-root p-value of the close series (constant, no trend).
+    Uses a fixed Schwert lag length instead of autolag='AIC', which refits
+    the regression for every candidate lag just to pick one.
+    Callers pass the last ADF_WINDOW closes.
+    """
+    # Imported here: statsmodels is slow to import and only ADF needs it
+    from statsmodels.tsa.stattools import adfuller
+    
+    maxlag = int(np.ceil(12 * (len(close) / 100) ** 0.25))
+    return float(adfuller(close, maxlag=maxlag, regression='c', autolag=None)[1])
+
+
+def _block_returns(returns, block_days):
+    """
+    Compounded returns of consecutive non-overlapping blocks of
+    `block_days` (trailing partial block dropped), in one reshape + prod.
+    """
+    n_blocks = len(returns) // block_days
+    mat = returns[:n_blocks * block_days].reshape(n_blocks, block_days)
+    return np.prod(1.0 + mat, axis=1) - 1.0
+
+
 def multi_day_momentum_corr(daily_returns, block_days=3):
     """
     Calculate momentum correlation using NON-OVERLAPPING multi-day blocks.
@@ -187,28 +452,30 @@ def multi_day_momentum_corr(daily_returns, block_days=3):
         return None, 0
     
     # Build non-overlapping block returns
-    blocks = []
-    for i in range(n_blocks):
-        start = i * block_days
-        end = start + block_days
-        block_return = np.prod(1 + daily_returns[start:end]) - 1
-        blocks.append(block_return)
-    
-    blocks = np.array(blocks)
+    blocks = _block_returns(daily_returns, block_days)
     
     # Consecutive block pairs: does block[i] predict block[i+1]?
-    x = blocks[:-1]
-    y = blocks[1:]
-    
-    if np.std(x) == 0 or np.std(y) == 0:
-        return None, 0
-    
-    corr = np.corrcoef(x, y)[0, 1]
+    corr = _lag1_corr(blocks)
     
     if np.isnan(corr):
         return None, 0
     
-    return float(corr), len(x)
+    return float(corr), len(blocks) - 1
+
+
+def _quartiles(x):
+    """
+    25th and 75th percentiles of x, matching np.percentile's default linear
+    interpolation, from one O(N) np.partition instead of two full sorts.
+    """
+    n = len(x)
+    pos = np.array([0.25, 0.75]) * (n - 1)
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, n - 1)
+    
+    part = np.partition(x, np.union1d(lo, hi))
+    q = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    return q[0], q[1]
 
 
 def non_overlapping_mean_reversion(returns, window_days):
@@ -225,67 +492,57 @@ def non_overlapping_mean_reversion(returns, window_days):
     if n_blocks < 6:
         return None, None
     
-    block_returns = []
-    for i in range(n_blocks):
-        start = i * window_days
-        end = start + window_days
-        block = returns[start:end]
-        block_ret = np.prod(1 + block) - 1
-        block_returns.append(block_ret)
-    
-    block_returns = np.array(block_returns)
+    block_returns = _block_returns(returns, window_days)
     
     if len(block_returns) < 6:
         return None, None
     
-    q75 = np.percentile(block_returns, 75)
-    q25 = np.percentile(block_returns, 25)
+    q25, q75 = _quartiles(block_returns)
     
     mean_rev_up = None
     mean_rev_down = None
     
-    # After large up blocks
-    up_next = []
-    for i in range(len(block_returns) - 1):
-        if block_returns[i] > q75:
-            up_next.append(block_returns[i + 1])
+    # Each block paired with the one that follows it
+    prev_blocks = block_returns[:-1]
+    next_blocks = block_returns[1:]
     
+    # After large up blocks
+    up_next = next_blocks[prev_blocks > q75]
     if len(up_next) > 0:
         mean_rev_up = float(np.mean(up_next))
     
     # After large down blocks
-    down_next = []
-    for i in range(len(block_returns) - 1):
-        if block_returns[i] < q25:
-            down_next.append(block_returns[i + 1])
-    
+    down_next = next_blocks[prev_blocks < q25]
     if len(down_next) > 0:
         mean_rev_down = float(np.mean(down_next))
     
     return mean_rev_up, mean_rev_down
 
 
-def volume_price_confirmation(df, lookback=60):
+def volume_price_confirmation(close, volume, lookback=60):
     """
     Volume-Price Confirmation Test (5th predictability test)
+    Takes the Close/Volume column arrays.
     """
     try:
-        recent = df.tail(lookback).copy()
+        recent_close = close[-lookback:]
         
-        if len(recent) < 20:
+        if len(recent_close) < 20:
             return None
         
-        recent['daily_return'] = recent['Close'].pct_change()
-        recent = recent.dropna(subset=['daily_return', 'Volume'])
+        # Daily returns within the window; each pairs with that day's volume
+        daily_return = np.diff(recent_close) / recent_close[:-1]
+        recent_volume = volume[-lookback:][1:]
+        valid = ~np.isnan(daily_return) & ~np.isnan(recent_volume)
         
-        up_days = recent[recent['daily_return'] > 0]
-        down_days = recent[recent['daily_return'] < 0]
+        up_volume = recent_volume[valid & (daily_return > 0)]
+        down_volume = recent_volume[valid & (daily_return < 0)]
         
-        if len(up_days) < 5 or len(down_days) < 5:
+        if len(up_volume) < 5 or len(down_volume) < 5:
             return None
         
-        avg_vol_up = float(up_days['Volume'].mean())
-        avg_vol_down = float(down_days['Volume'].mean())
+        avg_vol_up = float(up_volume.mean())
+        avg_vol_down = float(down_volume.mean())
         
         if avg_vol_down == 0:
             return None
@@ -293,9 +550,9 @@ def volume_price_confirmation(df, lookback=60):
         vp_ratio = avg_vol_up / avg_vol_down
         
         # Determine recent trend from last 63 trading days (3 months)
-        if len(df) >= 63:
-            price_now = float(df['Close'].iloc[-1])
-            price_3m = float(df['Close'].iloc[-63])
+        if len(close) >= 63:
+            price_now = float(close[-1])
+            price_3m = float(close[-63])
             trend_3m = (price_now - price_3m) / price_3m
         else:
             trend_3m = 0
@@ -489,35 +746,37 @@ def calculate_trade_quality(res):
     }
 
 
-def calculate_amihud_illiquidity(df):
+def liquidity_bundle(high, low, close, volume, lookback=30):
     """
-    Calculate Amihud Illiquidity ratio: |Return| / (Volume * Price)
+    Average volume, Amihud illiquidity and dynamic slippage from one slice
+    of the last `lookback` days, so the tails are taken once for all three.
+    Takes the High/Low/Close/Volume column arrays.
     """
+    c = close[-lookback - 1:]
+    tail_close = close[-lookback:]
+    tail_volume = volume[-lookback:]
+    
+    # Amihud Illiquidity ratio: |Return| / (Volume * Price)
     try:
-        df_temp = df.copy()
-        df_temp['abs_return'] = np.abs(df_temp['Return'])
-        df_temp['volume_times_price'] = df_temp['Volume'] * df_temp['Close']
-        df_temp['illiquidity'] = df_temp['abs_return'] / (df_temp['volume_times_price'] + 1e-10)
-        
-        amihud = df_temp['illiquidity'].tail(30).mean()
-        return float(amihud)
+        ret = np.diff(c) / c[:-1]
+        amihud = float(np.nanmean(
+            np.abs(ret[-lookback:]) / (tail_volume * tail_close + 1e-10)
+        ))
     except Exception:
-        return None
-
-
-def calculate_dynamic_slippage(df):
-    """
-    Estimate slippage based on volatility and daily price range.
-    """
+        amihud = None
+    
+    # Slippage estimate: a fraction of the average daily range
     try:
-        df_temp = df.copy()
-        df_temp['daily_range_pct'] = (df_temp['High'] - df_temp['Low']) / df_temp['Close']
-        avg_daily_range = df_temp['daily_range_pct'].tail(30).mean()
-        
-        estimated_slippage = avg_daily_range * 0.05
-        return float(estimated_slippage)
+        daily_range_pct = (high[-lookback:] - low[-lookback:]) / tail_close
+        slippage = float(np.nanmean(daily_range_pct) * 0.05)
     except Exception:
-        return 0.0005
+        slippage = 0.0005
+    
+    return {
+        'avg_daily_volume': float(np.nanmean(tail_volume)),
+        'amihud_illiquidity': amihud,
+        'dynamic_slippage': slippage,
+    }
 
 
 def get_liquidity_score(amihud_illiquidity, position_size_vs_volume):
@@ -556,33 +815,660 @@ def get_liquidity_warning(liquidity_score, position_size_vs_volume, amihud_illiq
     return ' | '.join(warnings) if warnings else None
 
 
+@njit(cache=True)
+def _price_stats(close, window):
+    """
+    Fused statistics kernel over the close series (one JIT call).
+    
+    Returns: ret_mean, ret_std, n_returns, window_mean, window_std
+    - ret_mean/ret_std: mean and population std of daily returns, accumulated
+      in a single Welford pass (non-finite returns are skipped, matching
+      pct_change().dropna())
+    - window_mean/window_std: mean and sample std of the last `window` closes
+    """
+    n = close.shape[0]
+    
+    n_returns = 0
+    ret_mean = 0.0
+    m2 = 0.0
+    for i in range(1, n):
+        r = close[i] / close[i - 1] - 1.0
+        if math.isfinite(r):
+            n_returns += 1
+            delta = r - ret_mean
+            ret_mean += delta / n_returns
+            m2 += delta * (r - ret_mean)
+    
+    ret_std = math.sqrt(m2 / n_returns) if n_returns > 0 else np.nan
+    if n_returns == 0:
+        ret_mean = np.nan
+    
+    window_mean = np.nan
+    window_std = np.nan
+    if window > 1 and n >= window:
+        total = 0.0
+        for i in range(n - window, n):
+            total += close[i]
+        window_mean = total / window
+        ss = 0.0
+        for i in range(n - window, n):
+            d = close[i] - window_mean
+            ss += d * d
+        window_std = math.sqrt(ss / (window - 1))
+    
+    return ret_mean, ret_std, n_returns, window_mean, window_std
+
+
+@njit(cache=True)
+def _ewm_last(x, span):
+    """
+    Last value of pandas' x.ewm(span=span).mean() and .std() (adjust=True,
+    bias=False) from one scalar recurrence, without allocating the full
+    output series.
+    
+    Returns: (ewm_mean, ewm_std)
+    """
+    alpha = 2.0 / (span + 1.0)
+    decay = 1.0 - alpha
+    
+    mean = x[0]
+    cov = 0.0
+    old_wt = 1.0
+    sum_wt = 1.0
+    sum_wt2 = 1.0
+    
+    for i in range(1, x.shape[0]):
+        cur = x[i]
+        is_observation = cur == cur
+        
+        if mean == mean:
+            sum_wt *= decay
+            sum_wt2 *= decay * decay
+            old_wt *= decay
+            if is_observation:
+                old_mean = mean
+                if mean != cur:
+                    mean = (old_wt * old_mean + cur) / (old_wt + 1.0)
+                cov = (old_wt * (cov + (old_mean - mean) ** 2) + (cur - mean) ** 2) / (old_wt + 1.0)
+                sum_wt += 1.0
+                sum_wt2 += 1.0
+                old_wt += 1.0
+        elif is_observation:
+            mean = cur
+    
+    # Unbiased (reliability-weighted) variance correction
+    numerator = sum_wt * sum_wt
+    denominator = numerator - sum_wt2
+    if denominator > 0:
+        std = math.sqrt(numerator / denominator * cov)
+    else:
+        std = np.nan
+    
+    return mean, std
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DATA CACHE — price history is fetched at most once per ticker per day,
+# Ticker.info at most once per INFO_TTL_SECONDS. Network round-trips
+# dominate analyze_stock wall time, so repeated lookups (UI refreshes,
+# batch re-runs) are served from memory or from disk under CACHE_DIR.
+# yfinance is imported inside the fetch functions: it is slow to import,
+# and cache hits never need it.
+# ═══════════════════════════════════════════════════════════════════════════
+CACHE_DIR = os.environ.get(
+    'STOCKAURA_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'stockaura')
+)
+
+# currentPrice moves intraday, so info expires sooner than the daily history
+INFO_TTL_SECONDS = float(os.environ.get('STOCKAURA_INFO_TTL', 3600))
+
+_history_cache = {}
+_info_cache = {}
+_cache_day = None
+_cache_day_lock = threading.Lock()
+
+# {ticker}_{period}_{day}.pkl histories, and the old {ticker}_info_{day}.json
+_DATED_FILE = re.compile(r'_(\d{4}-\d{2}-\d{2})\.(pkl|json)$')
+
+
+# Called before every provider request (see set_request_throttle)
+_request_throttle = None
+
+
+def set_request_throttle(func):
+    """
+    Install `func` (no arguments, may block) to run before each yfinance
+    request: the history downloads and Ticker.info. Batch callers pass a
+    rate limiter here so only real network calls wait; cache hits and the
+    analysis itself never do. None removes it.
+    """
+    global _request_throttle
+    _request_throttle = func
+
+
+def _before_request():
+    throttle = _request_throttle
+    if throttle is not None:
+        throttle()
+
+
+def _cache_path(filename):
+    return os.path.join(CACHE_DIR, filename.replace('/', '_'))
+
+
+def _roll_cache_day():
+    """
+    On the first cache access of a new day, drop earlier days' histories
+    and expired info from memory, and delete stale files under CACHE_DIR
+    (earlier days' histories, pre-TTL per-day info files, expired info
+    and results). Cheap no-op for the rest of the day.
+    """
+    global _cache_day
+    today = date.today().isoformat()
+    if _cache_day == today:
+        return
+    with _cache_day_lock:
+        if _cache_day == today:
+            return
+        _cache_day = today
+    
+    for key in list(_history_cache):
+        if key[2] != today:
+            _history_cache.pop(key, None)
+    now = time.time()
+    for ticker, cached in list(_info_cache.items()):
+        if now - cached[0] >= INFO_TTL_SECONDS:
+            _info_cache.pop(ticker, None)
+    
+    def prune(folder, is_stale):
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(folder, name)
+            try:
+                if is_stale(name, path):
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def stale_top_level(name, path):
+        dated = _DATED_FILE.search(name)
+        if dated:
+            return dated.group(2) == 'json' or dated.group(1) != today
+        if name.endswith('_info.json'):
+            return now - os.path.getmtime(path) >= INFO_TTL_SECONDS
+        return False
+    
+    prune(CACHE_DIR, stale_top_level)
+    prune(os.path.join(CACHE_DIR, 'results'),
+          lambda name, path: now - os.path.getmtime(path) >= INFO_TTL_SECONDS)
+
+
+def _load_history(ticker, period):
+    """
+    Daily OHLCV history for `ticker`, cached per (ticker, period, day).
+    
+    Returns a fresh copy each call since analyze_stock adds columns in place.
+    Empty frames (delisted symbol or transient provider failure) are not cached.
+    """
+    _roll_cache_day()
+    key = (ticker, period, date.today().isoformat())
+    df = _history_cache.get(key)
+    
+    if df is None:
+        path = _cache_path(f'{ticker}_{period}_{key[2]}.pkl')
+        if os.path.exists(path):
+            try:
+                df = pd.read_pickle(path)
+            except Exception:
+                df = None
+        
+        if df is None:
+            import yfinance as yf
+            _before_request()
+            df = yf.download(ticker, period=period, progress=False, threads=False,
+                             auto_adjust=True, multi_level_index=False)
+            if df.empty:
+                return df
+            _store_history(ticker, period, df)
+        else:
+            _history_cache[key] = df
+    
+    return df.copy()
+
+
+def _store_history(ticker, period, df):
+    """Put a downloaded history into the memory and disk caches."""
+    _roll_cache_day()
+    day = date.today().isoformat()
+    _history_cache[(ticker, period, day)] = df
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_pickle(_cache_path(f'{ticker}_{period}_{day}.pkl'))
+    except OSError:
+        pass
+
+
+def _load_info(ticker):
+    """
+    The Ticker.info fields analyze_stock uses, cached per ticker for
+    INFO_TTL_SECONDS (memory entries by fetch time, disk by file mtime).
+    """
+    _roll_cache_day()
+    now = time.time()
+    cached = _info_cache.get(ticker)
+    if cached is not None and now - cached[0] < INFO_TTL_SECONDS:
+        return cached[1]
+    
+    info = None
+    path = _cache_path(f'{ticker}_info.json')
+    try:
+        fetched_at = os.path.getmtime(path)
+        if now - fetched_at < INFO_TTL_SECONDS:
+            with open(path, 'r') as fp:
+                info = json.load(fp)
+    except (OSError, ValueError):
+        info = None
+    
+    if info is None:
+        import yfinance as yf
+        _before_request()
+        raw = yf.Ticker(ticker).info
+        info = {
+            'longName': raw.get('longName'),
+            'currentPrice': raw.get('currentPrice'),
+            'marketCap': raw.get('marketCap'),
+        }
+        fetched_at = now
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path, 'w') as fp:
+                json.dump(info, fp)
+        except OSError:
+            pass
+    
+    _info_cache[ticker] = (fetched_at, info)
+    
+    return info
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RESULT CACHE — a finished analyze_stock result for the same arguments and
+# day is reused for INFO_TTL_SECONDS (it embeds the live Ticker.info price).
+# Kept in memory and pickled under CACHE_DIR/results so dashboard reloads
+# and batch re-runs skip the whole pipeline. The memory side is an LRU of
+# RESULT_CACHE_SIZE entries (each result carries its OHLC payload).
+# ═══════════════════════════════════════════════════════════════════════════
+RESULT_CACHE_SIZE = 256
+
+_result_cache = OrderedDict()
+_result_lock = threading.Lock()
+
+
+def _result_path(key):
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, 'results', f'{digest}.pkl')
+
+
+def _result_key(ticker, period, window_days, account_size, risk_per_trade,
+                n_shuffles, quick_reject, emit_notes, include_ohlc):
+    return (ticker, period, date.today().isoformat(), window_days, account_size,
+            risk_per_trade, n_shuffles, quick_reject, emit_notes, include_ohlc)
+
+
+def has_cached_result(ticker, period="5y", window_days=5, account_size=10000,
+                      risk_per_trade=0.02, n_shuffles=50, quick_reject=False,
+                      emit_notes=True, include_ohlc=True):
+    """
+    Whether analyze_stock with these arguments would be served from the
+    result cache right now (checks freshness only, nothing is unpickled),
+    so batch callers can skip prefetching its price history.
+    """
+    key = _result_key(ticker, period, window_days, account_size, risk_per_trade,
+                      n_shuffles, quick_reject, emit_notes, include_ohlc)
+    now = time.time()
+    cached = _result_cache.get(key)
+    if cached is not None and now - cached[0] < INFO_TTL_SECONDS:
+        return True
+    try:
+        return now - os.path.getmtime(_result_path(key)) < INFO_TTL_SECONDS
+    except OSError:
+        return False
+
+
+def _load_result(key):
+    """Cached result for `key` (a shallow copy), or None if absent/expired."""
+    _roll_cache_day()
+    now = time.time()
+    with _result_lock:
+        cached = _result_cache.get(key)
+        if cached is not None:
+            if now - cached[0] < INFO_TTL_SECONDS:
+                _result_cache.move_to_end(key)
+            else:
+                del _result_cache[key]
+                cached = None
+    
+    if cached is None:
+        path = _result_path(key)
+        try:
+            fetched_at = os.path.getmtime(path)
+            if now - fetched_at < INFO_TTL_SECONDS:
+                cached = (fetched_at, pd.read_pickle(path))
+                _remember_result(key, cached)
+            else:
+                os.remove(path)
+        except Exception:
+            cached = None
+    
+    if cached is None:
+        return None
+    
+    # Callers (app.py) patch fields into the result; keep the cached one intact
+    return dict(cached[1])
+
+
+def _remember_result(key, entry):
+    """Insert into the in-memory LRU, evicting the least recently used."""
+    with _result_lock:
+        _result_cache[key] = entry
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+
+
+def _store_result(key, res):
+    """Put a finished result into the memory and disk caches."""
+    # A copy, since the caller goes on to return (and app.py to patch) res
+    res = dict(res)
+    _remember_result(key, (time.time(), res))
+    path = _result_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pd.to_pickle(res, path)
+    except OSError:
+        pass
+
+
+def clear_result_cache():
+    """
+    Drop every cached analyze_stock result, e.g. from a cron job after the
+    close so the next request picks up the new bar.
+    """
+    with _result_lock:
+        _result_cache.clear()
+    folder = os.path.join(CACHE_DIR, 'results')
+    try:
+        names = os.listdir(folder)
+    except OSError:
+        return
+    for name in names:
+        try:
+            os.remove(os.path.join(folder, name))
+        except OSError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# STATISTICS MEMO — ADF and the shuffled Hurst baseline depend only on the
+# price data, not on account size / risk settings, so re-running a ticker
+# with other parameters reuses them. Keyed by a hash of the input bytes, so
+# refreshed data simply misses.
+# ═══════════════════════════════════════════════════════════════════════════
+_STATS_MEMO_MAX = 512
+_stats_memo = OrderedDict()
+_stats_pending = {}  # key -> Event while one thread computes it
+_stats_lock = threading.Lock()
+
+
+def _memoized_stat(name, func, arr, *args):
+    """
+    func(arr, *args), memoized on (name, content hash of arr, args).
+    
+    Thread-safe LRU: concurrent misses on the same key wait for the one
+    computing it instead of repeating the work.
+    """
+    digest = hashlib.blake2b(arr.tobytes(), digest_size=16).digest()
+    key = (name, digest, arr.dtype.str, arr.shape, args)
+    
+    while True:
+        with _stats_lock:
+            result = _stats_memo.get(key)
+            if result is not None:
+                _stats_memo.move_to_end(key)
+                return result
+            pending = _stats_pending.get(key)
+            if pending is None:
+                pending = _stats_pending[key] = threading.Event()
+                break
+        # Another thread is computing it; if that one fails, try ourselves
+        pending.wait()
+    
+    try:
+        result = func(arr, *args)
+        with _stats_lock:
+            _stats_memo[key] = result
+            while len(_stats_memo) > _STATS_MEMO_MAX:
+                _stats_memo.popitem(last=False)  # drop the least recently used
+    finally:
+        with _stats_lock:
+            del _stats_pending[key]
+        pending.set()
+    
+    return result
+
+
+_OHLC_KEYS = ('Date', 'Open', 'High', 'Close', 'Low')
+
 exchange_to_currency = {'T': 'JPY', 'NYB': '', 'CO': 'DKK', 'L': 'GBP or GBX', 'DE': 'EUR', 'PA': 'EUR', 'TO': 'CAD', 'V': 'CAD'}
 
-def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_per_trade=0.02, n_shuffles=50):
+# ═══════════════════════════════════════════════════════════════════════
+# POSITION NOTE TEMPLATES
+# Parsed once at import; each is a bound str.format_map taking one dict
+# ═══════════════════════════════════════════════════════════════════════
+_ROUNDING_NOTE = (
+    "Buying {whole_shares} shares at ${current:,.2f} = ${position_value:,.2f} "
+    "(${leftover:,.2f} unused from ${trade_size:,.2f} trade size)."
+).format_map
+
+_NO_STOP_NOTE = (
+    "No stop loss — 100% risk tolerance means you accept total loss of ${position_value:,.2f}."
+).format_map
+
+_WIDE_STOP_NOTE = (
+    "Wide stop loss at {risk_pct:.1f}% — "
+    "you'd lose ${risk_amount:,.2f} if stop is hit."
+).format_map
+
+_UNAFFORDABLE_NOTE = (
+    "Cannot afford 1 share at ${current:,.2f} with ${trade_size:,.2f} trade size. "
+    "Minimum trade size: ${current:,.2f}. "
+    "The full analysis is shown below."
+).format_map
+
+_SPECULATIVE_NOTE = (
+    "⚠ SPECULATIVE: Position halved from {full_shares} to {half_shares} shares "
+    "(${half_position_value:,.2f}). Only {predictability_score}/5 statistical tests passed — "
+    "reduced position size limits downside from weaker conviction."
+).format_map
+
+
+def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_per_trade=0.02, n_shuffles=50,
+                  quick_reject=False, emit_notes=True, include_ohlc=True, use_cache=True,
+                  prefetched_df=None):
+    """
+    Full analysis of one ticker (see analyze_stocks for the keyword flags).
+    
+    prefetched_df is the ticker's current history as returned by
+    prefetch_prices; when given, no price download is made. Results are
+    cached per argument set and day unless use_cache=False.
+    """
+    key = _result_key(ticker, period, window_days, account_size, risk_per_trade,
+                      n_shuffles, quick_reject, emit_notes, include_ohlc)
+    if use_cache:
+        res = _load_result(key)
+        if res is not None:
+            return res
+    
+    if prefetched_df is not None:
+        df = prefetched_df
+    else:
+        try:
+            df = _load_history(ticker, period)
+        except Exception:
+            return {"error": "Connection error with data provider", "ticker": ticker}
+
+    res = _analyze_stock_df(df, ticker, period, window_days, account_size, risk_per_trade, n_shuffles,
+                            quick_reject, emit_notes, include_ohlc)
+    
+    # Errors are not cached: they are cheap and often transient
+    if use_cache and 'error' not in res:
+        _store_result(key, res)
+    
+    return res
+
+
+def _safe_analyze_stock_df(df, ticker, *args):
+    """
+    _analyze_stock_df that returns an error dict instead of raising, so one
+    bad history can't discard the rest of an analyze_stocks batch
+    (module-level so process-pool workers can unpickle it).
+    """
     try:
-        df = yf.download([ticker], period=period, progress=False)
+        return _analyze_stock_df(df, ticker, *args)
+    except Exception as e:
+        return {"error": f"Analysis failed: {e}", "ticker": ticker}
+
+
+def analyze_stocks(tickers, period="5y", window_days=5, account_size=10000, risk_per_trade=0.02,
+                   n_shuffles=50, max_workers=None, use_processes=False, quick_reject=False,
+                   emit_notes=True, include_ohlc=True):
+    """
+    Analyze many tickers with a single batched price download.
+    
+    One yf.download call fetches every history (instead of one HTTP
+    round-trip per ticker); the per-ticker analysis then runs on a thread
+    pool, since the heavy NumPy/numba work releases the GIL. With
+    use_processes=True it runs on a process pool instead, which also
+    parallelizes the pure-Python parts (each worker pays its own imports
+    and numba cache load, so this pays off for large batches).
+    
+    quick_reject=True (for screening) skips the shuffled Hurst baseline for
+    tickers the hard gates already reject. Their Hurst fields stay None and
+    the reported score leaves the Hurst test out; the final signal is
+    unchanged. emit_notes=False skips building the explanatory text
+    (position-size notes, failed-validation summary) that only the UI shows.
+    include_ohlc=False leaves out the per-day OHLC chart payload ('OHLC' is
+    None), which is most of the result's size.
+    
+    Returns: {ticker: result} with the same result/error dicts as analyze_stock
+    """
+    tickers = list(tickers)
+    try:
+        frames = prefetch_prices(tickers, period)
     except Exception:
-        return {"error": "Connection error with data provider", "ticker": ticker}
+        return {t: {"error": "Connection error with data provider", "ticker": t} for t in tickers}
+    
+    if use_processes:
+        # Spawned workers: forking a parent whose numba thread pool is already
+        # running is not safe
+        executor = ProcessPoolExecutor(max_workers=max_workers,
+                                       mp_context=multiprocessing.get_context('spawn'))
+    else:
+        launch_threads()
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    
+    with executor:
+        results = list(executor.map(
+            _safe_analyze_stock_df, [frames[t] for t in tickers], tickers,
+            repeat(period), repeat(window_days), repeat(account_size),
+            repeat(risk_per_trade), repeat(n_shuffles), repeat(quick_reject),
+            repeat(emit_notes), repeat(include_ohlc),
+        ))
+    
+    return dict(zip(tickers, results))
+
+
+def warm_up():
+    """
+    Load the compiled kernels and the lazily imported statistics modules
+    ahead of the first request (about 1.5 s otherwise paid by whoever asks
+    first). Uses the same dtypes as analyze_stock so the same numba
+    specializations are loaded. Call it from the main thread: it also starts
+    numba's parallel worker pool (see _njit.launch_threads).
+    """
+    launch_threads()
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0, 0.01, 300)
+    close = 100.0 * np.cumprod(1.0 + returns)
+    
+    hurst_with_baseline(returns.astype(np.float32), 2)
+    _price_stats(close, 20)
+    _ewm_last(close, 20)
+    ljung_box_pvalue(returns, lags=10)
+    adf_pvalue(close)
 
+
+def prefetch_prices(tickers, period="5y"):
+    """
+    Price histories for many tickers from one batched yf.download call.
+    
+    Each non-empty history also goes into the per-day history cache.
+    Returns {ticker: DataFrame}, with an empty frame for tickers the
+    provider returned nothing for. Download errors propagate to the caller.
+    """
+    import yfinance as yf
+    
+    tickers = list(tickers)
+    _before_request()
+    bulk = yf.download(tickers, period=period, group_by='ticker', progress=False,
+                       threads=True, auto_adjust=True)
+    
+    frames = {}
+    for ticker in tickers:
+        if isinstance(bulk.columns, pd.MultiIndex) and ticker in bulk.columns.get_level_values(0):
+            # Calendars differ across exchanges; drop rows padded in for other tickers
+            df = bulk[ticker].dropna(how='all')
+            if not df.empty:
+                _store_history(ticker, period, df)
+            frames[ticker] = df.copy()
+        else:
+            frames[ticker] = pd.DataFrame()
+    
+    return frames
+
+
+def _analyze_stock_df(df, ticker, period, window_days, account_size, risk_per_trade, n_shuffles,
+                      quick_reject=False, emit_notes=True, include_ohlc=True):
+    """Full analysis of an already-downloaded price history (no price download)."""
     if df.empty:
         return {"error": "No data found, symbol may be delisted", "ticker": ticker}
 
     if len(df) < 252:
         return {"error": "Insufficient historical data", "ticker": ticker}
 
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-
-    yfticker = yf.Ticker(ticker)
+    info = _load_info(ticker)
     tmp = ticker.split('.')
     currency = 'USD'
     if len(tmp) == 2:
         currency = exchange_to_currency[tmp[1]]
-    title = yfticker.info.get('longName')
-    current = yfticker.info.get('currentPrice')
-    cap = format_number(yfticker.info.get('marketCap'))
+    title = info.get('longName')
+    current = info.get('currentPrice')
+    cap = format_number(info.get('marketCap'))
+
+    # Struct-of-arrays: one contiguous (4, N) float64 block, one row per
+    # column. Everything below works on these rows; the DataFrame is only
+    # kept for the OHLC chart payload.
+    hlcv = np.ascontiguousarray(
+        df[['High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64).T
+    )
+    high_arr, low_arr, close_arr, volume_arr = hlcv
+
     if current is None or current == 0:
-        current = round(float(df['Close'].iloc[-1]),2)
+        current = round(float(close_arr[-1]),2)
     
     # ═══════════════════════════════════════════════════════════════════════
     # FIX #1: REMOVED the early return that blocked the entire results page
@@ -590,12 +1476,16 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
     # and handle affordability in the position sizing section instead.
     # ═══════════════════════════════════════════════════════════════════════
     
-    OHLC = df.reset_index()[['Date','Open', 'High', 'Close', 'Low']]
-    OHLC['Date'] = pd.to_datetime(OHLC['Date']).dt.strftime('%Y-%m-%d')
-
-    df['Return'] = df['Close'].pct_change()
-
-    returns = df['Return'].dropna().values
+    # Chart payload: one record per day, zipped straight from the columns
+    OHLC = None
+    if include_ohlc:
+        OHLC = [
+            dict(zip(_OHLC_KEYS, row)) for row in zip(
+                df.index.strftime('%Y-%m-%d').tolist(),
+                df['Open'].to_numpy(dtype=np.float64).tolist(),
+                high_arr.tolist(), close_arr.tolist(), low_arr.tolist(),
+            )
+        ]
 
     res = {
         'ticker': ticker,
@@ -656,7 +1546,7 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
         'current': current,
         'cap': cap,
         'currency': currency,
-        'OHLC': OHLC.to_dict('records'),
+        'OHLC': OHLC,
         'data_points': len(df),
         'transaction_cost': 0.001,  # 0.1% per trade
         'slippage': 0.0005,  # 0.05%
@@ -665,35 +1555,30 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
     }
 
     # Split data: 70% train, 30% test for out-of-sample validation
+    # (returns computed once on the close array; return i belongs to row i+1)
     split_idx = int(len(df) * 0.7)
-    df_train = df.iloc[:split_idx]
-    df_test = df.iloc[split_idx:]
-    
-    returns_train = df_train['Return'].dropna().values
-    returns_test = df_test['Return'].dropna().values
+    rets = np.diff(close_arr) / close_arr[:-1]
+    returns_train = rets[:split_idx - 1]
+    returns_test = rets[split_idx - 1:]
+    returns_train = returns_train[~np.isnan(returns_train)]
+    returns_test = returns_test[~np.isnan(returns_test)]
+    n_train = returns_train.size
+    n_test = returns_test.size
 
-    # CALCULATE RECENT RETURNS
-    current = df['Close'].iloc[-1]
-    
-    if len(df) >= 252:
-        price_1y_ago = df['Close'].iloc[-252]
-        recent_return_1y = (current - price_1y_ago) / price_1y_ago
-        res['recent_return_1y'] = float(recent_return_1y)
+    # CALCULATE RECENT RETURNS (1y / 6m / 3m / 1m in one gather)
+    current = close_arr[-1]
     
-    if len(df) >= 126:
-        price_6m_ago = df['Close'].iloc[-126]
-        recent_return_6m = (current - price_6m_ago) / price_6m_ago
-        res['recent_return_6m'] = float(recent_return_6m)
+    lookbacks = np.array([252, 126, 63, 21])
+    available = lookbacks <= len(close_arr)
+    past = close_arr[-lookbacks[available]]
+    recent_returns = (current - past) / past
     
-    if len(df) >= 63:
-        price_3m_ago = df['Close'].iloc[-63]
-        recent_return_3m = (current - price_3m_ago) / price_3m_ago
-        res['recent_return_3m'] = float(recent_return_3m)
-    
-    if len(df) >= 21:
-        price_1m_ago = df['Close'].iloc[-21]
-        recent_return_1m = (current - price_1m_ago) / price_1m_ago
-        res['recent_return_1m'] = float(recent_return_1m)
+    keys = compress(
+        ('recent_return_1y', 'recent_return_6m', 'recent_return_3m', 'recent_return_1m'),
+        available
+    )
+    for key, value in zip(keys, recent_returns):
+        res[key] = float(value)
     
     # Determine trend direction
     if res['recent_return_1y'] is not None:
@@ -704,28 +1589,24 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
         else:
             res['trend_direction'] = 'NEUTRAL'
 
+    # Return moments and the latest 20-day window from one fused kernel pass
+    avg_ret, std_dev, n_returns, roll_m, curr_std = _price_stats(close_arr, 20)
+
     # Z-SCORE (Simple 20-day MA)
     if len(df) >= 20:
-        roll_m = df['Close'].rolling(window=20).mean()
-        roll_s = df['Close'].rolling(window=20).std()
-        curr_std = roll_s.iloc[-1]
         if curr_std > 0:
-            z = (df['Close'].iloc[-1] - roll_m.iloc[-1]) / curr_std
+            z = (close_arr[-1] - roll_m) / curr_std
             res['zscore'] = float(z)
 
     # Z-EMA (Exponential 20-day MA)
     if len(df) >= 20:
-        ema_m = df['Close'].ewm(span=20).mean()
-        ema_s = df['Close'].ewm(span=20).std()
-        ema_std = ema_s.iloc[-1]
+        ema_m, ema_std = _ewm_last(close_arr, 20)
         if ema_std > 0:
-            z_ema = (df['Close'].iloc[-1] - ema_m.iloc[-1]) / ema_std
+            z_ema = (close_arr[-1] - ema_m) / ema_std
             res['z_ema'] = float(z_ema)
 
     # Risk & Performance Metrics
-    if len(returns) > 2:
-        std_dev = returns.std()
-        avg_ret = returns.mean()
+    if n_returns > 2:
         res['volatility'] = float(std_dev * np.sqrt(252) * 100)
         res['Return'] = float(avg_ret * 252 * 100)
         if std_dev > 0:
@@ -793,28 +1674,28 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
             risk_amount = position_value * risk_per_trade
             res['position_risk_amount'] = float(risk_amount)
             
-            notes = []
-            
-            # Note about rounding down
-            leftover = trade_size - position_value
-            if leftover > 0 and exact_shares >= 1.5:
-                notes.append(
-                    f"Buying {whole_shares} shares at ${current:,.2f} = ${position_value:,.2f} "
-                    f"(${leftover:,.2f} unused from ${trade_size:,.2f} trade size)."
-                )
-            
-            if risk_per_trade >= 1.0:
-                notes.append(
-                    f"No stop loss — 100% risk tolerance means you accept total loss of ${position_value:,.2f}."
-                )
-            elif risk_per_trade >= 0.5:
-                notes.append(
-                    f"Wide stop loss at {risk_per_trade*100:.1f}% — "
-                    f"you'd lose ${risk_amount:,.2f} if stop is hit."
-                )
-            
-            if notes:
-                res['position_size_note'] = ' '.join(notes)
+            # Explanatory notes (UI text; skipped when emit_notes is off)
+            if emit_notes:
+                notes = []
+                
+                # Note about rounding down
+                leftover = trade_size - position_value
+                if leftover > 0 and exact_shares >= 1.5:
+                    notes.append(_ROUNDING_NOTE({
+                        'whole_shares': whole_shares, 'current': current,
+                        'position_value': position_value, 'leftover': leftover,
+                        'trade_size': trade_size,
+                    }))
+                
+                if risk_per_trade >= 1.0:
+                    notes.append(_NO_STOP_NOTE({'position_value': position_value}))
+                elif risk_per_trade >= 0.5:
+                    notes.append(_WIDE_STOP_NOTE({
+                        'risk_pct': risk_per_trade * 100, 'risk_amount': risk_amount,
+                    }))
+                
+                if notes:
+                    res['position_size_note'] = ' '.join(notes)
                 
         else:
             # Can't afford even 1 share
@@ -824,74 +1705,47 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
             res['stop_loss_price_short'] = None
             res['position_risk_amount'] = None
             
-            res['position_size_note'] = (
-                f"Cannot afford 1 share at ${current:,.2f} with ${trade_size:,.2f} trade size. "
-                f"Minimum trade size: ${current:,.2f}. "
-                f"The full analysis is shown below."
-            )
+            if emit_notes:
+                res['position_size_note'] = _UNAFFORDABLE_NOTE({
+                    'current': current, 'trade_size': trade_size,
+                })
 
     # ═══════════════════════════════════════════════════════════════════════
     # PREDICTABILITY SCORE (5 tests, each worth 1 point)
+    # Each test records a pass flag; the score is their sum (set after test 5)
     # ═══════════════════════════════════════════════════════════════════════
+    hurst_pass = momentum_pass = mean_rev_pass = regime_pass = vp_pass = False
 
     # Ljung-Box Test (informational only — NOT scored)
-    if len(returns_train) > 10:
-        lb_test = acorr_ljungbox(returns_train, lags=[10], return_df=True)
-        res['lb_pvalue'] = float(lb_test.iloc[0, 1])
+    if n_train > 10:
+        res['lb_pvalue'] = ljung_box_pvalue(returns_train, lags=10)
 
     # ADF Test (informational only — NOT scored)
-    if len(df['Close'].dropna()) > 20:
+    close_clean = close_arr[~np.isnan(close_arr)]
+    if len(close_clean) > 20:
         try:
-            adf_result = adfuller(df['Close'].dropna())
-            res['adf_pvalue'] = float(adf_result[1])
-        except Exception: 
-            pass
-
-    # HURST EXPONENT (DFA with shuffled baseline)
-    if len(returns_train) > 100:
-        try:
-            H, H_shuf_mean, H_shuf_std, is_sig, _, _, _ = hurst_with_baseline(
-                returns_train, n_shuffles=n_shuffles
+            res['adf_pvalue'] = _memoized_stat(
+                'adf', adf_pvalue, close_clean[-ADF_WINDOW:]
             )
-            if not np.isnan(H):
-                res['hurst'] = float(H)
-                res['hurst_significant'] = bool(is_sig)
-                if not np.isnan(H_shuf_mean):
-                    res['hurst_shuffled_mean'] = float(H_shuf_mean)
-                
-                if is_sig and (H > 0.55 or H < 0.45):
-                    res['predictability_score'] += 1
-        except Exception:
-            pass
-    
-    # Hurst out-of-sample
-    oos_shuffles = max(10, n_shuffles // 3)
-    if len(returns_test) > 100:
-        try:
-            H_oos, _, _, _, _, _, _ = hurst_with_baseline(returns_test, n_shuffles=oos_shuffles)
-            if not np.isnan(H_oos):
-                res['hurst_oos'] = float(H_oos)
-        except Exception:
+        except Exception: 
             pass
 
     # MOMENTUM CORRELATION
-    if len(returns_train) > 30:
+    if n_train > 30:
         m_corr, n_pairs = multi_day_momentum_corr(returns_train, block_days=3)
         if m_corr is not None:
             res['momentum_corr'] = float(m_corr)
-            if abs(m_corr) > 0.08:
-                res['predictability_score'] += 1
+            momentum_pass = abs(m_corr) > 0.08
 
         mean_rev_up, mean_rev_down = non_overlapping_mean_reversion(returns_train, window_days)
         res['mean_rev_up'] = mean_rev_up
         res['mean_rev_down'] = mean_rev_down
 
         if res['mean_rev_up'] is not None and res['mean_rev_down'] is not None:
-            if abs(res['mean_rev_up']) > 0.003 and abs(res['mean_rev_down']) > 0.003:
-                res['predictability_score'] += 1
+            mean_rev_pass = abs(res['mean_rev_up']) > 0.003 and abs(res['mean_rev_down']) > 0.003
 
     # OUT-OF-SAMPLE TESTING
-    if len(returns_test) > 30:
+    if n_test > 30:
         m_corr_oos, _ = multi_day_momentum_corr(returns_test, block_days=3)
         if m_corr_oos is not None:
             res['momentum_corr_oos'] = float(m_corr_oos)
@@ -903,50 +1757,101 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
     # REGIME STABILITY CHECK
     MOMENTUM_MIN_THRESHOLD = 0.05
     
-    if res.get('momentum_corr') is not None and res.get('momentum_corr_oos') is not None:
-        corr_in = res['momentum_corr']
-        corr_oos = res['momentum_corr_oos']
-        
+    # The decision blocks below work on local bindings of the metrics and
+    # write each result into res once (res is the JSON payload)
+    corr_in = res['momentum_corr']
+    corr_oos = res['momentum_corr_oos']
+    regime_stability = None
+    
+    if corr_in is not None and corr_oos is not None:
         if abs(corr_in) > MOMENTUM_MIN_THRESHOLD:
             same_sign = (corr_in > 0 and corr_oos > 0) or (corr_in < 0 and corr_oos < 0)
             
             if same_sign and abs(corr_oos) >= MOMENTUM_MIN_THRESHOLD:
-                res['regime_stability'] = 1.0
+                regime_stability = 1.0
             elif same_sign:
-                res['regime_stability'] = 0.5
+                regime_stability = 0.5
             else:
-                res['regime_stability'] = 0.0
+                regime_stability = 0.0
         else:
-            res['regime_stability'] = 0.0
-    
-    if (res.get('hurst') is not None and res.get('hurst_oos') is not None 
-        and res.get('hurst_significant')):
-        hurst_in = res['hurst']
-        hurst_oos = res['hurst_oos']
-        
-        in_trending = hurst_in > 0.55
-        in_reverting = hurst_in < 0.45
-        oos_trending = hurst_oos > 0.55
-        oos_reverting = hurst_oos < 0.45
-        
-        hurst_agrees = (in_trending and oos_trending) or (in_reverting and oos_reverting)
-        
-        if not hurst_agrees and res.get('regime_stability', 0) > 0.5:
-            res['regime_stability'] = 0.5
+            regime_stability = 0.0
 
     # PREDICTABILITY TEST 4: Regime Stability OOS
-    if res.get('regime_stability') is not None and res['regime_stability'] >= 0.5:
-        res['predictability_score'] += 1
+    # (the Hurst cross-check further down never takes it below 0.5)
+    regime_pass = regime_stability is not None and regime_stability >= 0.5
 
     # PREDICTABILITY TEST 5: Volume-Price Confirmation
-    vp_data = volume_price_confirmation(df, lookback=60)
+    vp_data = volume_price_confirmation(close_arr, volume_arr, lookback=60)
     if vp_data is not None:
         res['volume_price_data'] = vp_data
         res['vp_ratio'] = vp_data['vp_ratio']
         res['vp_confirming'] = vp_data['vp_confirming']
         
-        if vp_data['vp_confirming']:
-            res['predictability_score'] += 1
+        vp_pass = bool(vp_data['vp_confirming'])
+
+    # HURST EXPONENT (DFA with shuffled baseline)
+    # Single precision input: the shuffles are memory-bound and DFA only
+    # needs the integrated profile, which is accumulated in float64.
+    #
+    # Computed last because it is by far the most expensive test. With
+    # quick_reject it is skipped when the hard gates in
+    # generate_trading_signal already guarantee DO_NOT_TRADE: the regime
+    # has flipped (Hurst can only lower a 1.0 regime to 0.5), or no cheap
+    # test passed, so the score cannot reach 2 even if Hurst passes.
+    certain_reject = (
+        (regime_stability is not None and regime_stability < 0.5)
+        or not (momentum_pass or mean_rev_pass or regime_pass or vp_pass)
+    )
+    run_hurst = not (quick_reject and certain_reject)
+    
+    if run_hurst and n_train > 100:
+        try:
+            H, H_shuf_mean, H_shuf_std, is_sig, _, _, _ = _memoized_stat(
+                'hurst', hurst_with_baseline, returns_train.astype(np.float32), n_shuffles
+            )
+            if not np.isnan(H):
+                res['hurst'] = float(H)
+                res['hurst_significant'] = bool(is_sig)
+                if not np.isnan(H_shuf_mean):
+                    res['hurst_shuffled_mean'] = float(H_shuf_mean)
+                
+                hurst_pass = bool(is_sig) and (H > 0.55 or H < 0.45)
+        except Exception:
+            pass
+    
+    # Hurst out-of-sample
+    oos_shuffles = max(10, n_shuffles // 3)
+    if run_hurst and n_test > 100:
+        try:
+            H_oos, _, _, _, _, _, _ = _memoized_stat(
+                'hurst', hurst_with_baseline, returns_test.astype(np.float32), oos_shuffles
+            )
+            if not np.isnan(H_oos):
+                res['hurst_oos'] = float(H_oos)
+        except Exception:
+            pass
+
+    # Hurst disagreement between train and OOS caps the regime at 0.5
+    hurst_in = res['hurst']
+    hurst_oos = res['hurst_oos']
+    hurst_significant = res['hurst_significant']
+    
+    if hurst_in is not None and hurst_oos is not None and hurst_significant:
+        in_trending = hurst_in > 0.55
+        in_reverting = hurst_in < 0.45
+        oos_trending = hurst_oos > 0.55
+        oos_reverting = hurst_oos < 0.45
+        
+        hurst_agrees = (in_trending and oos_trending) or (in_reverting and oos_reverting)
+        
+        if not hurst_agrees and regime_stability is not None and regime_stability > 0.5:
+            regime_stability = 0.5
+    
+    res['regime_stability'] = regime_stability
+    
+    res['predictability_score'] = int(
+        hurst_pass + momentum_pass + mean_rev_pass + regime_pass + vp_pass
+    )
 
     # ═══════════════════════════════════════════════════════════════════════
     # LIQUIDITY ANALYSIS — FIX #3: Liquidity is now ADVISORY, not a gate.
@@ -965,12 +1870,12 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
     # - Edge vs friction still matters (keeps the 3x friction gate)
     # ═══════════════════════════════════════════════════════════════════════
 
-    # Calculate 30-day average volume
-    avg_vol_30 = df['Volume'].tail(30).mean()
-    res['avg_daily_volume'] = float(avg_vol_30)
+    # 30-day average volume, Amihud Illiquidity Ratio and slippage
+    liquidity = liquidity_bundle(high_arr, low_arr, close_arr, volume_arr)
+    avg_vol_30 = liquidity['avg_daily_volume']
+    res['avg_daily_volume'] = avg_vol_30
     
-    # Amihud Illiquidity Ratio
-    amihud = calculate_amihud_illiquidity(df)
+    amihud = liquidity['amihud_illiquidity']
     res['amihud_illiquidity'] = amihud
     
     # Position size as % of daily volume
@@ -982,7 +1887,7 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
         res['position_size_vs_volume'] = float(position_size_vs_vol)
     
     # Dynamic Slippage Estimate
-    dynamic_slippage = calculate_dynamic_slippage(df)
+    dynamic_slippage = liquidity['dynamic_slippage']
     res['estimated_slippage_pct'] = dynamic_slippage * 100
     
     # Total Friction (Slippage + Transaction Cost) round trip
@@ -1030,25 +1935,21 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
         )
 
     # GENERATE FINAL TRADING SIGNAL
-    res['final_signal'] = generate_trading_signal(res)
+    final_signal = generate_trading_signal(res)
+    res['final_signal'] = final_signal
+    predictability_score = res['predictability_score']
     
     # Update stop loss based on final signal (LONG vs SHORT)
     # Skip if risk_per_trade >= 1.0 (no stop loss)
-    if (res['final_signal'] and res.get('stop_loss_price_long') is not None 
+    if (final_signal and res.get('stop_loss_price_long') is not None 
         and res.get('stop_loss_price_short') is not None):
-        short_signals = [
-            'SHORT_DOWNTREND', 'SHORT_BOUNCES_ONLY', 'SHORT_MOMENTUM',
-            'SPEC_SHORT_DOWNTREND', 'SPEC_SHORT_BOUNCES_ONLY', 'SPEC_SHORT_MOMENTUM',
-            'WAIT_OR_SHORT_BOUNCE', 'SPEC_WAIT_OR_SHORT_BOUNCE'
-        ]
-        
-        if res['final_signal'] in short_signals:
+        if final_signal in SHORT_SIGNALS:
             res['stop_loss_price'] = res['stop_loss_price_short']
         else:
             res['stop_loss_price'] = res['stop_loss_price_long']
     
     # SPECULATIVE TIER: Halve position size for 2/5 predictability signals
-    if res['final_signal'] and res['final_signal'].startswith('SPEC_'):
+    if final_signal and final_signal.startswith('SPEC_'):
         if res.get('suggested_shares') is not None and res['suggested_shares'] > 1:
             full_shares = res['suggested_shares']
             half_shares = max(1, full_shares // 2)
@@ -1059,42 +1960,45 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
             half_position_value = half_shares * (res.get('current') or 0)
             res['position_risk_amount'] = float(half_position_value * risk_per_trade)
             
-            res['position_size_note'] = (
-                f"⚠ SPECULATIVE: Position halved from {full_shares} to {half_shares} shares "
-                f"(${half_position_value:,.2f}). Only {res.get('predictability_score', 0)}/5 statistical tests passed — "
-                f"reduced position size limits downside from weaker conviction."
-            )
+            if emit_notes:
+                res['position_size_note'] = _SPECULATIVE_NOTE({
+                    'full_shares': full_shares, 'half_shares': half_shares,
+                    'half_position_value': half_position_value,
+                    'predictability_score': predictability_score,
+                })
     
     # TRADE QUALITY SCORE
-    if res['final_signal'] and res['final_signal'] not in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL'):
+    if final_signal and final_signal not in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL'):
         quality = calculate_trade_quality(res)
         res['trade_quality'] = quality['trade_quality']
         res['quality_components'] = quality['quality_components']
         res['quality_label'] = quality['quality_label']
     
     # Zero out edge if pattern failed statistical validation
-    if res['final_signal'] in ['DO_NOT_TRADE', 'NO_CLEAR_SIGNAL']:
+    if final_signal in ['DO_NOT_TRADE', 'NO_CLEAR_SIGNAL']:
         res['expected_edge_pct'] = 0.0
-        
+    
+    # Explain the failed validation (UI text; skipped when emit_notes is off)
+    if emit_notes and final_signal in ['DO_NOT_TRADE', 'NO_CLEAR_SIGNAL']:
         validation_failures = []
         
-        if res.get('predictability_score', 0) < 2:
-            validation_failures.append(f"Predictability score {res['predictability_score']}/5 (need ≥2)")
+        if predictability_score < 2:
+            validation_failures.append(f"Predictability score {predictability_score}/5 (need ≥2)")
         
-        if res.get('regime_stability') is not None and res.get('regime_stability') < 0.5:
-            if res.get('regime_stability') == 0.0:
+        if regime_stability is not None and regime_stability < 0.5:
+            if regime_stability == 0.0:
                 validation_failures.append("Regime stability 0% — momentum direction REVERSED out-of-sample")
             else:
-                validation_failures.append(f"Regime stability {res['regime_stability']*100:.0f}% (need ≥50%)")
+                validation_failures.append(f"Regime stability {regime_stability*100:.0f}% (need ≥50%)")
         
-        if res.get('momentum_corr') is not None and abs(res['momentum_corr']) <= 0.08:
-            validation_failures.append(f"Weak momentum (|r|={abs(res['momentum_corr']):.3f}, need >0.08)")
+        if corr_in is not None and abs(corr_in) <= 0.08:
+            validation_failures.append(f"Weak momentum (|r|={abs(corr_in):.3f}, need >0.08)")
         
-        if res.get('hurst_significant') is False:
+        if hurst_significant is False:
             validation_failures.append("Hurst exponent not distinguishable from random (failed baseline test)")
         
-        if res.get('vp_confirming') is False or res.get('vp_confirming') is None:
-            vp_ratio = res.get('vp_ratio')
+        if not res['vp_confirming']:
+            vp_ratio = res['vp_ratio']
             if vp_ratio is not None:
                 validation_failures.append(f"Volume doesn't confirm trend (up/down vol ratio: {vp_ratio:.2f})")
             else:
@@ -1115,6 +2019,21 @@ def analyze_stock(ticker, period="5y", window_days=5, account_size=10000, risk_p
     return res
 
 
+# Signals whose stop loss sits above entry
+SHORT_SIGNALS = frozenset({
+    'SHORT_DOWNTREND', 'SHORT_BOUNCES_ONLY', 'SHORT_MOMENTUM',
+    'SPEC_SHORT_DOWNTREND', 'SPEC_SHORT_BOUNCES_ONLY', 'SPEC_SHORT_MOMENTUM',
+    'WAIT_OR_SHORT_BOUNCE', 'SPEC_WAIT_OR_SHORT_BOUNCE'
+})
+
+# Actionable signals get the SPEC_ prefix in the speculative tier
+ACTIONABLE_SIGNALS = frozenset({
+    'BUY_UPTREND', 'BUY_PULLBACK', 'BUY_MOMENTUM',
+    'SHORT_DOWNTREND', 'SHORT_BOUNCES_ONLY', 'SHORT_MOMENTUM',
+    'WAIT_OR_SHORT_BOUNCE', 'WAIT_FOR_REVERSAL'
+})
+
+
 def generate_trading_signal(res):
     """
     Generate final trading signal based on all metrics.
@@ -1136,96 +2055,106 @@ def generate_trading_signal(res):
     It does NOT block the signal. The user can adjust account/risk.
     """
     
+    return classify_signal(
+        res.get('predictability_score', 0),
+        res.get('regime_stability'),
+        res.get('is_liquid_enough', False),
+        res.get('momentum_corr'),
+        res.get('trend_direction'),
+        res.get('hurst'),
+        res.get('hurst_significant', False),
+        res.get('z_ema'),
+    )
+
+
+def classify_signal(pred_score, regime_stability, is_liquid_enough, momentum, trend,
+                    hurst, hurst_significant, z_ema):
+    """
+    The decision behind generate_trading_signal, on plain scalars.
+    
+    Takes no result dict, so sweeps and backtests can call it directly; the
+    arguments are the same-named analyze_stock fields (None where missing).
+    """
     # HARD GATE: Minimum predictability
-    pred_score = res.get('predictability_score', 0)
     if pred_score < 2:
         return 'DO_NOT_TRADE'
     
     # HARD GATE: Regime Stability (no sign flips)
-    if res.get('regime_stability') is not None and res.get('regime_stability') < 0.5:
+    if regime_stability is not None and regime_stability < 0.5:
         return 'DO_NOT_TRADE'
     
     # HARD GATE: Edge vs Friction (pattern quality, not position sizing)
-    if not res.get('is_liquid_enough', False):
+    if not is_liquid_enough:
         return 'DO_NOT_TRADE'
     
     # Determine tier
     is_speculative = pred_score < 3
     
     # Momentum check
-    momentum = res.get('momentum_corr')
     if momentum is None or abs(momentum) <= 0.08:
         return 'NO_CLEAR_SIGNAL'
     
     # Trend direction
-    trend = res.get('trend_direction')
     if trend not in ['UP', 'DOWN']:
         if abs(momentum) > 0.15:
             return 'WAIT_FOR_TREND'
         else:
             return 'DO_NOT_TRADE'
     
-    hurst = res.get('hurst')
-    z_ema = res.get('z_ema')
-    hurst_significant = res.get('hurst_significant', False)
-    
-    # ─── GENERATE SIGNAL ────────────────────────────────────────────────
-    signal = None
-    
+    # ─── LOOK UP SIGNAL ─────────────────────────────────────────────────
+    hurst_trending = bool(hurst_significant and hurst is not None and hurst > 0.55)
+    key = (trend, momentum > 0.08, hurst_trending, _z_ema_bucket(trend, z_ema), is_speculative)
+    return _SIGNAL_TABLE[key]
+
+
+def _z_ema_bucket(trend, z_ema):
+    """
+    Entry-timing bucket of z_ema relative to the trend:
+    0 = stretched (wait), 1 = in range, 2 = pulled back, 3 = unavailable.
+    """
+    if z_ema is None:
+        return 3
     if trend == 'UP':
-        if momentum > 0.08:
-            if hurst_significant and hurst is not None and hurst > 0.55:
-                if z_ema is not None:
-                    if z_ema > 1.0:
-                        signal = 'WAIT_PULLBACK'
-                    elif z_ema > -0.5:
-                        signal = 'BUY_UPTREND'
-                    else:
-                        signal = 'BUY_PULLBACK'
-                else:
-                    signal = 'BUY_UPTREND'
-            else:
-                if z_ema is not None and z_ema > 1.0:
-                    signal = 'WAIT_PULLBACK'
-                else:
-                    signal = 'BUY_MOMENTUM'
-        else:
-            signal = 'WAIT_OR_SHORT_BOUNCE'
-    
-    elif trend == 'DOWN':
-        if momentum > 0.08:
-            if hurst_significant and hurst is not None and hurst > 0.55:
-                if z_ema is not None:
-                    if z_ema < -1.0:
-                        signal = 'WAIT_SHORT_BOUNCE'
-                    elif z_ema < 0.5:
-                        signal = 'SHORT_DOWNTREND'
+        return 0 if z_ema > 1.0 else 1 if z_ema > -0.5 else 2
+    return 0 if z_ema < -1.0 else 1 if z_ema < 0.5 else 2
+
+
+def _build_signal_table():
+    """
+    (trend, momentum_up, hurst_trending, z_bucket, is_speculative) -> signal,
+    built once at import so generate_trading_signal is a single dict probe.
+    """
+    # Per trend: signal by z bucket with a trending Hurst, signal by z bucket
+    # without one, and the signal when momentum is not positive
+    rows = {
+        'UP': (
+            ('WAIT_PULLBACK', 'BUY_UPTREND', 'BUY_PULLBACK', 'BUY_UPTREND'),
+            ('WAIT_PULLBACK', 'BUY_MOMENTUM', 'BUY_MOMENTUM', 'BUY_MOMENTUM'),
+            'WAIT_OR_SHORT_BOUNCE',
+        ),
+        'DOWN': (
+            ('WAIT_SHORT_BOUNCE', 'SHORT_DOWNTREND', 'SHORT_BOUNCES_ONLY', 'SHORT_DOWNTREND'),
+            ('WAIT_SHORT_BOUNCE', 'SHORT_MOMENTUM', 'SHORT_MOMENTUM', 'SHORT_MOMENTUM'),
+            'WAIT_FOR_REVERSAL',
+        ),
+    }
+    table = {}
+    for trend, (with_hurst, without_hurst, counter) in rows.items():
+        for momentum_up in (True, False):
+            for hurst_trending in (True, False):
+                for z_bucket in range(4):
+                    if not momentum_up:
+                        signal = counter
+                    elif hurst_trending:
+                        signal = with_hurst[z_bucket]
                     else:
-                        signal = 'SHORT_BOUNCES_ONLY'
-                else:
-                    signal = 'SHORT_DOWNTREND'
-            else:
-                if z_ema is not None and z_ema < -1.0:
-                    signal = 'WAIT_SHORT_BOUNCE'
-                else:
-                    signal = 'SHORT_MOMENTUM'
-        else:
-            signal = 'WAIT_FOR_REVERSAL'
-    
-    else:
-        if abs(momentum) > 0.15:
-            signal = 'WAIT_FOR_TREND'
-        else:
-            signal = 'DO_NOT_TRADE'
-    
-    # ─── APPLY SPECULATIVE PREFIX ───────────────────────────────────────
-    if is_speculative and signal is not None:
-        actionable_signals = [
-            'BUY_UPTREND', 'BUY_PULLBACK', 'BUY_MOMENTUM',
-            'SHORT_DOWNTREND', 'SHORT_BOUNCES_ONLY', 'SHORT_MOMENTUM',
-            'WAIT_OR_SHORT_BOUNCE', 'WAIT_FOR_REVERSAL'
-        ]
-        if signal in actionable_signals:
-            signal = 'SPEC_' + signal
-    
-    return signal or 'DO_NOT_TRADE'
+                        signal = without_hurst[z_bucket]
+                    
+                    table[(trend, momentum_up, hurst_trending, z_bucket, False)] = signal
+                    if signal in ACTIONABLE_SIGNALS:
+                        signal = 'SPEC_' + signal
+                    table[(trend, momentum_up, hurst_trending, z_bucket, True)] = signal
+    return table
+
+
+_SIGNAL_TABLE = _build_signal_table()
@@ -1,11 +1,28 @@
-from analysis import analyze_stock
+from contextlib import asynccontextmanager
+from analysis import analyze_stock, warm_up
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import trie
 import json
+import logging
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Compile/load numeric kernels at server startup rather than on the first
+    # /analyze request (not at import, so importing app stays cheap). Best
+    # effort: analyze_stock copes with these failing, so the API must too.
+    try:
+        warm_up()
+    except Exception:
+        logger.exception("Warm-up failed; the first /analyze request will pay for it")
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins  = [
         "http://localhost",
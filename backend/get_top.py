@@ -12,36 +12,65 @@ Signal tiers:
   ⚪ DO NOT TRADE     — Failed validation
 """
 
+import argparse
 import json
+import math
 import sys
-from typing import Dict, List
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, TextIO
 import time
 from datetime import datetime
 import random
 
+try:
+    import orjson  # optional: faster JSON load/dump
+except ImportError:
+    orjson = None
+
 # Add backend to path
 sys.path.insert(0, './backend')
-from analysis import analyze_stock as run_analysis
+from analysis import (analyze_stock as run_analysis, has_cached_result, prefetch_prices,
+                      set_request_throttle, warm_up)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
 TICKERS_FILE = "tickers.json"
 TOP_N_STOCKS = 800                  # Top 800 by market cap
-REQUEST_DELAY = 1.0                 # Seconds between API requests
+REQUEST_DELAY = 1.0                 # Seconds between API requests (across all workers)
+DEFAULT_WORKERS = 8                 # Concurrent analyses; overlaps network waits with compute
+PREFETCH_BATCH = 50                 # Tickers per batched price download
 MAX_RETRIES = 3
 RETRY_DELAY = 5
 DEFAULT_ACCOUNT_SIZE = 10000
 DEFAULT_RISK_PER_TRADE = 0.02
 BATCH_SHUFFLES = 30                 # Fewer shuffles for speed (50 for individual lookups)
 
-last_request_time = 0
+# analyze_stock arguments for every batch analysis (also the result cache key)
+ANALYSIS_ARGS = MappingProxyType({
+    'period': '5y',
+    'window_days': 5,
+    'account_size': DEFAULT_ACCOUNT_SIZE,
+    'risk_per_trade': DEFAULT_RISK_PER_TRADE,
+    'n_shuffles': BATCH_SHUFFLES,
+    'include_ohlc': False,
+})
+
+# Report separators, built once
+_HR = '=' * 80
+_HR_WIDE = '=' * 100
+_SUB_WIDE = '-' * 100
+_HR_NARROW = '=' * 60
 
 
 def load_tickers(filepath: str, limit: int = None) -> List[Dict[str, str]]:
     """Load tickers from JSON file (assumes sorted by market cap)"""
-    with open(filepath, 'r') as f:
-        data = json.load(f)
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
     
     tickers = []
     for key, value in data.items():
@@ -55,42 +84,77 @@ def load_tickers(filepath: str, limit: int = None) -> List[Dict[str, str]]:
     return tickers
 
 
-def rate_limited_sleep():
-    """Enforce rate limiting"""
-    global last_request_time
+class RateLimiter:
+    """
+    Thread-safe request pacing: calls to wait() start at least `delay`
+    seconds apart (plus up to `jitter` random seconds) across all threads.
     
-    current_time = time.time()
-    time_since_last = current_time - last_request_time
+    Each caller reserves the next free slot under the lock and sleeps
+    outside it, so one sleeping worker never blocks the others' bookkeeping.
+    """
     
-    if time_since_last < REQUEST_DELAY:
-        sleep_time = REQUEST_DELAY - time_since_last + random.uniform(0, 0.2)
-        time.sleep(sleep_time)
+    def __init__(self, delay: float, jitter: float = 0.2):
+        self.delay = delay
+        self.jitter = jitter
+        self._last_request_time = 0.0
+        self._lock = threading.Lock()
     
-    last_request_time = time.time()
+    def wait(self):
+        with self._lock:
+            current_time = time.time()
+            time_since_last = current_time - self._last_request_time
+            
+            sleep_time = 0.0
+            if time_since_last < self.delay:
+                sleep_time = self.delay - time_since_last + random.uniform(0, self.jitter)
+            
+            self._last_request_time = current_time + sleep_time
+        
+        if sleep_time > 0:
+            time.sleep(sleep_time)
 
 
-def analyze_stock_with_retry(ticker: str, title: str, retry_count: int = 0) -> Dict:
-    """Analyze with retry logic and batch-optimized shuffle count"""
-    try:
-        rate_limited_sleep()
-        
-        data = run_analysis(
-            ticker=ticker,
-            period='5y',
-            window_days=5,
-            account_size=DEFAULT_ACCOUNT_SIZE,
-            risk_per_trade=DEFAULT_RISK_PER_TRADE,
-            n_shuffles=BATCH_SHUFFLES
-        )
+rate_limiter = RateLimiter(REQUEST_DELAY)
+
+
+def _is_rate_limited(message: str) -> bool:
+    """Whether an error message looks like Yahoo throttling us"""
+    message = message.lower()
+    return 'unauthorized' in message or '401' in message or 'crumb' in message
+
+
+def analyze_stock_with_retry(ticker: str, title: str, use_cache: bool = True,
+                             prefetched_df=None) -> Optional[Dict]:
+    """
+    Analyze with retry logic and batch-optimized shuffle count.
+    
+    Rate-limit errors are retried up to MAX_RETRIES times with exponential
+    backoff (RETRY_DELAY, 2x, 4x, ... plus jitter); other errors give None.
+    use_cache=False recomputes instead of reusing a cached result from today;
+    prefetched_df (from prefetch_prices) skips the per-ticker price download.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            data = run_analysis(
+                ticker=ticker,
+                **ANALYSIS_ARGS,
+                use_cache=use_cache,
+                prefetched_df=prefetched_df
+            )
+            error = data.get('error')
+        except Exception as e:
+            error = e
         
-        if data.get('error'):
-            error_msg = str(data.get('error', '')).lower()
-            if ('unauthorized' in error_msg or '401' in error_msg or 'crumb' in error_msg) and retry_count < MAX_RETRIES:
-                print(f"   ⏳ Rate limited on {ticker}, waiting {RETRY_DELAY}s... (retry {retry_count + 1}/{MAX_RETRIES})")
-                time.sleep(RETRY_DELAY)
-                return analyze_stock_with_retry(ticker, title, retry_count + 1)
+        if not error:
+            break
+        if attempt == MAX_RETRIES or not _is_rate_limited(str(error)):
             return None
         
+        backoff = RETRY_DELAY * 2 ** attempt + random.uniform(0, 1)
+        print(f"   ⏳ Rate limited on {ticker}, waiting {backoff:.0f}s... (retry {attempt + 1}/{MAX_RETRIES})")
+        time.sleep(backoff)
+    
+    try:
         score = calculate_score(data)
         
         return {
@@ -122,16 +186,28 @@ def analyze_stock_with_retry(ticker: str, title: str, retry_count: int = 0) -> D
             'trade_quality': data.get('trade_quality'),
             'quality_label': data.get('quality_label'),
         }
-        
-    except Exception as e:
-        error_msg = str(e).lower()
-        if ('unauthorized' in error_msg or '401' in error_msg or 'crumb' in error_msg) and retry_count < MAX_RETRIES:
-            print(f"   ⏳ Rate limited on {ticker}, waiting {RETRY_DELAY}s... (retry {retry_count + 1}/{MAX_RETRIES})")
-            time.sleep(RETRY_DELAY)
-            return analyze_stock_with_retry(ticker, title, retry_count + 1)
+    except Exception:
         return None
 
 
+# Signal quality points for calculate_score (read-only, built once)
+SIGNAL_SCORES: Mapping[str, int] = MappingProxyType({
+    # High conviction
+    'BUY_UPTREND': 20, 'BUY_PULLBACK': 20,
+    'SHORT_DOWNTREND': 18, 'BUY_MOMENTUM': 15, 'SHORT_MOMENTUM': 15,
+    'SHORT_BOUNCES_ONLY': 12,
+    'WAIT_PULLBACK': 8, 'WAIT_SHORT_BOUNCE': 8,
+    'WAIT_OR_SHORT_BOUNCE': 5, 'WAIT_FOR_REVERSAL': 5, 'WAIT_FOR_TREND': 3,
+    # Speculative (same base scores but lower due to 2/5 predictability)
+    'SPEC_BUY_UPTREND': 15, 'SPEC_BUY_PULLBACK': 15,
+    'SPEC_SHORT_DOWNTREND': 13, 'SPEC_BUY_MOMENTUM': 10, 'SPEC_SHORT_MOMENTUM': 10,
+    'SPEC_SHORT_BOUNCES_ONLY': 8,
+    'SPEC_WAIT_OR_SHORT_BOUNCE': 3, 'SPEC_WAIT_FOR_REVERSAL': 3,
+    # Rejected
+    'NO_CLEAR_SIGNAL': 0, 'DO_NOT_TRADE': -50
+})
+
+
 def calculate_score(data: Dict) -> float:
     """
     Calculate composite score for ranking.
@@ -162,22 +238,7 @@ def calculate_score(data: Dict) -> float:
             score += min(20, (ratio - 3) * 4)
     
     # Signal quality (0-20) — includes speculative signals
-    signal_scores = {
-        # High conviction
-        'BUY_UPTREND': 20, 'BUY_PULLBACK': 20,
-        'SHORT_DOWNTREND': 18, 'BUY_MOMENTUM': 15, 'SHORT_MOMENTUM': 15,
-        'SHORT_BOUNCES_ONLY': 12,
-        'WAIT_PULLBACK': 8, 'WAIT_SHORT_BOUNCE': 8,
-        'WAIT_OR_SHORT_BOUNCE': 5, 'WAIT_FOR_REVERSAL': 5, 'WAIT_FOR_TREND': 3,
-        # Speculative (same base scores but lower due to 2/5 predictability)
-        'SPEC_BUY_UPTREND': 15, 'SPEC_BUY_PULLBACK': 15,
-        'SPEC_SHORT_DOWNTREND': 13, 'SPEC_BUY_MOMENTUM': 10, 'SPEC_SHORT_MOMENTUM': 10,
-        'SPEC_SHORT_BOUNCES_ONLY': 8,
-        'SPEC_WAIT_OR_SHORT_BOUNCE': 3, 'SPEC_WAIT_FOR_REVERSAL': 3,
-        # Rejected
-        'NO_CLEAR_SIGNAL': 0, 'DO_NOT_TRADE': -50
-    }
-    score += signal_scores.get(data.get('final_signal', ''), 0)
+    score += SIGNAL_SCORES.get(data.get('final_signal', ''), 0)
     
     # Liquidity bonus
     if not data.get('liquidity_failed', False):
@@ -190,8 +251,8 @@ def calculate_score(data: Dict) -> float:
     return score
 
 
-def get_signal_icon(signal: str) -> str:
-    """Map signal to display icon"""
+def _icon_for(signal: str) -> str:
+    """Map signal to display icon (substring rules)"""
     if not signal:
         return '⚪'
     
@@ -213,8 +274,8 @@ def get_signal_icon(signal: str) -> str:
         return '⚪'
 
 
-def get_signal_category(signal: str) -> str:
-    """Categorize signal for counting"""
+def _category_for(signal: str) -> str:
+    """Categorize signal for counting (substring rules)"""
     if not signal:
         return 'none'
     if signal.startswith('SPEC_'):
@@ -228,62 +289,203 @@ def get_signal_category(signal: str) -> str:
     return 'none'
 
 
-def analyze_batch(tickers: List[Dict]) -> List[Dict]:
-    """Analyze stocks sequentially with rate limiting"""
+# Every known signal classified once; unknown ones fall back to the rules
+_SIGNAL_ICON: Mapping[str, str] = MappingProxyType(
+    {signal: _icon_for(signal) for signal in SIGNAL_SCORES}
+)
+_SIGNAL_CATEGORY: Mapping[str, str] = MappingProxyType(
+    {signal: _category_for(signal) for signal in SIGNAL_SCORES}
+)
+
+
+def _distribution_keys(signal: str) -> tuple:
+    """Summary buckets a signal counts toward (a signal can hit several)"""
+    if signal.startswith('SPEC_'):
+        keys = [f'spec_{word.lower()}' for word in ('BUY', 'SHORT', 'WAIT') if word in signal]
+    else:
+        keys = [word.lower() for word in ('BUY', 'SHORT', 'WAIT') if word in signal]
+    if signal in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL', ''):
+        keys.append('dnt')
+    return tuple(keys)
+
+
+_SIGNAL_DISTRIBUTION: Mapping[str, tuple] = MappingProxyType(
+    {signal: _distribution_keys(signal) for signal in SIGNAL_SCORES}
+)
+
+
+def category_counts(signal_counts: Counter) -> Counter:
+    """Progress-line counts (one get_signal_category bucket per signal)"""
+    counts = Counter()
+    for signal, n in signal_counts.items():
+        counts[get_signal_category(signal)] += n
+    return counts
+
+
+def signal_distribution(signal_counts: Counter) -> Counter:
+    """print_summary's overall stats buckets, from per-signal counts"""
+    distribution = Counter()
+    for signal, n in signal_counts.items():
+        keys = _SIGNAL_DISTRIBUTION.get(signal)
+        for key in (keys if keys is not None else _distribution_keys(signal)):
+            distribution[key] += n
+    return distribution
+
+
+def get_signal_icon(signal: str) -> str:
+    """Map signal to display icon"""
+    icon = _SIGNAL_ICON.get(signal)
+    return icon if icon is not None else _icon_for(signal)
+
+
+def get_signal_category(signal: str) -> str:
+    """Categorize signal for counting"""
+    category = _SIGNAL_CATEGORY.get(signal)
+    return category if category is not None else _category_for(signal)
+
+
+def prefetch_batches(symbols: List[str]) -> Dict:
+    """
+    Price histories for all symbols, PREFETCH_BATCH per rate-limited request.
+    
+    Symbols missing from the result (failed batch, empty frame) are left to
+    analyze_stock's own per-ticker download.
+    """
+    frames = {}
+    print(f"📥 Prefetching price history in batches of {PREFETCH_BATCH}...")
+    
+    for start in range(0, len(symbols), PREFETCH_BATCH):
+        try:
+            batch = prefetch_prices(symbols[start:start + PREFETCH_BATCH],
+                                    period=ANALYSIS_ARGS['period'])
+        except Exception as e:
+            print(f"   ⚠ Prefetch failed for batch {start // PREFETCH_BATCH + 1}: {e}")
+            continue
+        frames.update((ticker, df) for ticker, df in batch.items() if not df.empty)
+    
+    return frames
+
+
+def uncached_symbols(tickers: List[Dict], use_cache: bool = True) -> List[str]:
+    """Tickers without a fresh cached result, i.e. that need provider requests"""
+    symbols = [t['ticker'] for t in tickers]
+    if use_cache:
+        symbols = [s for s in symbols if not has_cached_result(s, **ANALYSIS_ARGS)]
+    return symbols
+
+
+def estimate_minutes(n_uncached: int) -> float:
+    """
+    Expected run time: each uncached ticker needs at least a Ticker.info
+    request, spaced by the rate limiter (plus jitter); the analysis overlaps
+    with those waits on the pool, and cached tickers take no time to speak of.
+    """
+    return n_uncached * (rate_limiter.delay + 0.1) / 60
+
+
+def analyze_batch(tickers: List[Dict], max_workers: int = DEFAULT_WORKERS,
+                  use_cache: bool = True, signal_counts: Counter = None) -> List[Dict]:
+    """
+    Analyze stocks on a thread pool; provider requests share a rate limit.
+    Progress prints in completion order; results are sorted by score.
+    
+    `signal_counts` (final_signal -> count, '' for none) is the one tally
+    kept as results arrive. The progress lines read it through
+    category_counts, and print_summary can reuse it instead of rescanning.
+    """
     results = []
     
-    est_minutes = len(tickers) * 1.1 / 60  # ~1.1s per stock with overhead
+    # Tickers with a fresh cached result (e.g. a same-day re-run) need no history
+    symbols = uncached_symbols(tickers, use_cache)
+    est_minutes = estimate_minutes(len(symbols))
     
-    print(f"\n{'='*80}")
+    print(f"\n{_HR}")
     print(f"Analyzing TOP {len(tickers)} stocks by market cap")
-    print(f"Rate limit: {REQUEST_DELAY}s per request | Hurst shuffles: {BATCH_SHUFFLES}")
+    print(f"Rate limit: {rate_limiter.delay}s per request | Workers: {max_workers} | Hurst shuffles: {BATCH_SHUFFLES}")
     print(f"Estimated time: ~{est_minutes:.0f}-{est_minutes*1.5:.0f} minutes")
-    print(f"{'='*80}\n")
+    print(f"{_HR}\n")
+    
+    # The shared limiter paces provider requests only (installed in analysis),
+    # so cached tickers and the analysis itself never wait for it
+    set_request_throttle(rate_limiter.wait)
     
     start_time = time.time()
-    counts = {'buy': 0, 'short': 0, 'wait': 0, 'speculative': 0}
+    if signal_counts is None:
+        signal_counts = Counter()
+    
+    frames = prefetch_batches(symbols) if symbols else {}
+    
+    # Load the kernels once, and start numba's worker pool from this thread
+    # rather than from a pool worker (see _njit.launch_threads)
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"   ⚠ Warm-up failed: {e}")
     
-    for i, ticker_info in enumerate(tickers, 1):
-        result = analyze_stock_with_retry(ticker_info['ticker'], ticker_info['title'])
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(analyze_stock_with_retry, t['ticker'], t['title'],
+                            use_cache=use_cache, prefetched_df=frames.get(t['ticker'])): t
+            for t in tickers
+        }
         
-        if result:
-            results.append(result)
-            
-            signal = result.get('final_signal', '')
-            icon = get_signal_icon(signal)
-            cat = get_signal_category(signal)
-            if cat in counts:
-                counts[cat] += 1
-            
-            # Calculate ETA
-            elapsed = time.time() - start_time
-            rate = i / elapsed if elapsed > 0 else 0
-            remaining = len(tickers) - i
-            eta_minutes = (remaining / rate / 60) if rate > 0 else 0
+        for i, future in enumerate(as_completed(futures), 1):
+            ticker_info = futures[future]
+            result = future.result()
             
-            # Truncate signal for display
-            display_signal = signal[:22] if signal else 'N/A'
+            if result:
+                results.append(result)
+                
+                signal = result.get('final_signal', '')
+                icon = get_signal_icon(signal)
+                signal_counts[signal or ''] += 1
+                
+                # Calculate ETA
+                elapsed = time.time() - start_time
+                rate = i / elapsed if elapsed > 0 else 0
+                remaining = len(tickers) - i
+                eta_minutes = (remaining / rate / 60) if rate > 0 else 0
+                
+                # Truncate signal for display
+                display_signal = signal[:22] if signal else 'N/A'
+                
+                print(f"[{i:3d}/{len(tickers)}] {icon} {ticker_info['ticker']:6s} "
+                      f"Score: {result['score']:6.1f} | {display_signal:22s} "
+                      f"| ETA: {eta_minutes:4.1f}m")
+            else:
+                print(f"[{i:3d}/{len(tickers)}] ✗ {ticker_info['ticker']:6s} FAILED")
             
-            print(f"[{i:3d}/{len(tickers)}] {icon} {ticker_info['ticker']:6s} "
-                  f"Score: {result['score']:6.1f} | {display_signal:22s} "
-                  f"| ETA: {eta_minutes:4.1f}m")
-        else:
-            print(f"[{i:3d}/{len(tickers)}] ✗ {ticker_info['ticker']:6s} FAILED")
+            # Progress update every 50 stocks
+            if i % 50 == 0:
+                elapsed_mins = (time.time() - start_time) / 60
+                counts = category_counts(signal_counts)
+                print(f"\n📊 Progress: {i}/{len(tickers)} | "
+                      f"Tradeable: {len(results)} | "
+                      f"🟢 {counts['buy']} | 🔴 {counts['short']} | "
+                      f"🟡 {counts['wait']} | 🟠 {counts['speculative']} spec | "
+                      f"Time: {elapsed_mins:.1f}m\n")
         
-        # Progress update every 50 stocks
-        if i % 50 == 0:
-            elapsed_mins = (time.time() - start_time) / 60
-            print(f"\n📊 Progress: {i}/{len(tickers)} | "
-                  f"Tradeable: {len(results)} | "
-                  f"🟢 {counts['buy']} | 🔴 {counts['short']} | "
-                  f"🟡 {counts['wait']} | 🟠 {counts['speculative']} spec | "
-                  f"Time: {elapsed_mins:.1f}m\n")
-    
-    # Sort by score
+    # Sort by score; ties keep the input (market cap) order, not completion order
+    position = {t['ticker']: n for n, t in enumerate(tickers)}
+    results.sort(key=lambda x: position[x['ticker']])
     results.sort(key=lambda x: x['score'], reverse=True)
     return results
 
 
+def _json_safe(value):
+    """
+    Copy of `value` with non-finite floats as None, so the saved file is the
+    same with orjson (which writes null) and stdlib json (which writes NaN).
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    return value
+
+
 def save_results(results: List[Dict], filename: str = "top_stocks.json"):
     """Save to JSON"""
     # Save all tradeable results (not just top 50)
@@ -301,30 +503,44 @@ def save_results(results: List[Dict], filename: str = "top_stocks.json"):
         },
         'stocks': results[:100]  # Top 100 for review
     }
+    output = _json_safe(output)
     
-    with open(filename, 'w') as f:
-        json.dump(output, f, indent=2)
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
+    else:
+        # UTF-8 without escapes, like orjson
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, ensure_ascii=False, allow_nan=False)
     
     print(f"\n✅ Saved top 100 to {filename}")
     return filename
 
 
-def print_summary(results: List[Dict]):
-    """Print categorized results"""
+def print_summary(results: List[Dict], signal_counts: Counter = None,
+                  output: Optional[TextIO] = None) -> str:
+    """
+    Print categorized results (buffered, written in one call).
+    
+    Writes to `output` (default: sys.stdout) and returns the report text,
+    so callers can capture it without redirecting stdout.
+    """
+    lines = []
+    emit = lines.append
     
     # Separate by tier
     high_conviction = [r for r in results if r.get('final_signal') and 
                        not r['final_signal'].startswith('SPEC_') and
                        r['final_signal'] not in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL')]
-    speculative = [r for r in results if r.get('final_signal', '').startswith('SPEC_')]
+    speculative = [r for r in results if (r.get('final_signal') or '').startswith('SPEC_')]
     
     # ── HIGH CONVICTION ──────────────────────────────────────────────────
     if high_conviction:
-        print(f"\n{'='*100}")
-        print(f"🏆 HIGH CONVICTION SIGNALS ({len(high_conviction)} stocks) — 3-5/5 predictability")
-        print(f"{'='*100}")
-        print(f"{'#':<4} {'Ticker':<8} {'Score':<7} {'Signal':<24} {'Edge%':<8} {'Pred':<5} {'Stab':<6} {'Qual':<6} {'Trend':<6}")
-        print(f"{'-'*100}")
+        emit(f"\n{_HR_WIDE}")
+        emit(f"🏆 HIGH CONVICTION SIGNALS ({len(high_conviction)} stocks) — 3-5/5 predictability")
+        emit(f"{_HR_WIDE}")
+        emit(f"{'#':<4} {'Ticker':<8} {'Score':<7} {'Signal':<24} {'Edge%':<8} {'Pred':<5} {'Stab':<6} {'Qual':<6} {'Trend':<6}")
+        emit(f"{_SUB_WIDE}")
         
         for i, s in enumerate(high_conviction[:30], 1):
             signal = s['final_signal'][:22] if s['final_signal'] else 'N/A'
@@ -341,18 +557,18 @@ def print_summary(results: List[Dict]):
             else:
                 sig = f"{signal:24s}"
             
-            print(f"{i:<4} {s['ticker']:<8} {s['score']:<7.1f} {sig} {edge:<8} "
-                  f"{s['predictability_score']}/5   {stab:<6} {qual:<6} {s.get('trend_direction', 'N/A'):<6}")
+            emit(f"{i:<4} {s['ticker']:<8} {s['score']:<7.1f} {sig} {edge:<8} "
+                  f"{s['predictability_score']}/5   {stab:<6} {qual:<6} {s.get('trend_direction') or 'N/A':<6}")
     else:
-        print(f"\n⚪ No high-conviction signals found.")
+        emit(f"\n⚪ No high-conviction signals found.")
     
     # ── SPECULATIVE ──────────────────────────────────────────────────────
     if speculative:
-        print(f"\n{'='*100}")
-        print(f"⚠  SPECULATIVE SIGNALS ({len(speculative)} stocks) — 2/5 predictability, half position")
-        print(f"{'='*100}")
-        print(f"{'#':<4} {'Ticker':<8} {'Score':<7} {'Signal':<24} {'Edge%':<8} {'Pred':<5} {'Stab':<6} {'Qual':<6} {'Trend':<6}")
-        print(f"{'-'*100}")
+        emit(f"\n{_HR_WIDE}")
+        emit(f"⚠  SPECULATIVE SIGNALS ({len(speculative)} stocks) — 2/5 predictability, half position")
+        emit(f"{_HR_WIDE}")
+        emit(f"{'#':<4} {'Ticker':<8} {'Score':<7} {'Signal':<24} {'Edge%':<8} {'Pred':<5} {'Stab':<6} {'Qual':<6} {'Trend':<6}")
+        emit(f"{_SUB_WIDE}")
         
         for i, s in enumerate(speculative[:30], 1):
             signal = s['final_signal'][:22] if s['final_signal'] else 'N/A'
@@ -362,51 +578,63 @@ def print_summary(results: List[Dict]):
             
             sig = f"\033[93m{signal:24s}\033[0m"  # Orange/yellow
             
-            print(f"{i:<4} {s['ticker']:<8} {s['score']:<7.1f} {sig} {edge:<8} "
-                  f"{s['predictability_score']}/5   {stab:<6} {qual:<6} {s.get('trend_direction', 'N/A'):<6}")
+            emit(f"{i:<4} {s['ticker']:<8} {s['score']:<7.1f} {sig} {edge:<8} "
+                  f"{s['predictability_score']}/5   {stab:<6} {qual:<6} {s.get('trend_direction') or 'N/A':<6}")
     else:
-        print(f"\n⚪ No speculative signals found.")
+        emit(f"\n⚪ No speculative signals found.")
     
     # ── OVERALL STATS ────────────────────────────────────────────────────
-    all_signals = [r.get('final_signal', '') for r in results]
-    buy = sum(1 for s in all_signals if 'BUY' in s and not s.startswith('SPEC_'))
-    short = sum(1 for s in all_signals if 'SHORT' in s and not s.startswith('SPEC_'))
-    wait = sum(1 for s in all_signals if 'WAIT' in s and not s.startswith('SPEC_'))
-    spec_buy = sum(1 for s in all_signals if s.startswith('SPEC_') and 'BUY' in s)
-    spec_short = sum(1 for s in all_signals if s.startswith('SPEC_') and 'SHORT' in s)
-    spec_wait = sum(1 for s in all_signals if s.startswith('SPEC_') and 'WAIT' in s)
-    dnt = sum(1 for s in all_signals if s in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL', ''))
-    
-    print(f"\n{'='*60}")
-    print(f"📈 Signal Distribution ({len(results)} analyzed)")
-    print(f"{'='*60}")
-    print(f"   HIGH CONVICTION:")
-    print(f"      🟢 BUY:   {buy:3d} stocks")
-    print(f"      🔴 SHORT: {short:3d} stocks")
-    print(f"      🟡 WAIT:  {wait:3d} stocks")
-    print(f"   SPECULATIVE (half position):")
-    print(f"      🟢 BUY:   {spec_buy:3d} stocks")
-    print(f"      🔴 SHORT: {spec_short:3d} stocks")
-    print(f"      🟡 WAIT:  {spec_wait:3d} stocks")
-    print(f"   ⚪ DO NOT TRADE: {dnt:3d} stocks")
-    print(f"{'='*60}\n")
+    if signal_counts is None:
+        signal_counts = Counter(r.get('final_signal') or '' for r in results)
+    distribution = signal_distribution(signal_counts)
+    
+    buy, short, wait = distribution['buy'], distribution['short'], distribution['wait']
+    spec_buy, spec_short = distribution['spec_buy'], distribution['spec_short']
+    spec_wait, dnt = distribution['spec_wait'], distribution['dnt']
+    
+    emit(f"\n{_HR_NARROW}")
+    emit(f"📈 Signal Distribution ({len(results)} analyzed)")
+    emit(f"{_HR_NARROW}")
+    emit(f"   HIGH CONVICTION:")
+    emit(f"      🟢 BUY:   {buy:3d} stocks")
+    emit(f"      🔴 SHORT: {short:3d} stocks")
+    emit(f"      🟡 WAIT:  {wait:3d} stocks")
+    emit(f"   SPECULATIVE (half position):")
+    emit(f"      🟢 BUY:   {spec_buy:3d} stocks")
+    emit(f"      🔴 SHORT: {spec_short:3d} stocks")
+    emit(f"      🟡 WAIT:  {spec_wait:3d} stocks")
+    emit(f"   ⚪ DO NOT TRADE: {dnt:3d} stocks")
+    emit(f"{_HR_NARROW}\n")
+    
+    text = '\n'.join(lines) + '\n'
+    (output or sys.stdout).write(text)
+    return text
 
 
 def main():
-    print(f"\n{'='*100}")
+    parser = argparse.ArgumentParser(description="Scan the top stocks by market cap")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"concurrent analyses (default: {DEFAULT_WORKERS})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="recompute every ticker instead of reusing today's cached results")
+    args = parser.parse_args()
+    
+    print(f"\n{_HR_WIDE}")
     print("STOCKAURA — TOP 800 MARKET CAP ANALYZER")
     print(f"Hurst shuffles: {BATCH_SHUFFLES} (batch mode) | Min predictability: 2/5")
-    print(f"{'='*100}\n")
+    print(f"{_HR_WIDE}\n")
     
     print("📂 Loading tickers...")
     tickers = load_tickers(TICKERS_FILE, limit=TOP_N_STOCKS)
     print(f"✅ Loaded {len(tickers)} stocks (top {TOP_N_STOCKS} by market cap)")
     
-    est_minutes = len(tickers) * 1.1 / 60
+    est_minutes = estimate_minutes(len(uncached_symbols(tickers, not args.no_cache)))
     input(f"\n⏸  Press ENTER to start analysis (~{est_minutes:.0f}-{est_minutes*1.5:.0f} minutes)...")
     
     start = time.time()
-    results = analyze_batch(tickers)
+    signal_counts = Counter()
+    results = analyze_batch(tickers, max_workers=args.workers, use_cache=not args.no_cache,
+                            signal_counts=signal_counts)
     elapsed = (time.time() - start) / 60
     
     tradeable = [r for r in results if r.get('final_signal') not in ('DO_NOT_TRADE', 'NO_CLEAR_SIGNAL', None)]
@@ -416,7 +644,7 @@ def main():
     print(f"✅ Tradeable: {len(tradeable)} opportunities ({len([r for r in tradeable if not r['final_signal'].startswith('SPEC_')])} high conviction, {len([r for r in tradeable if r['final_signal'].startswith('SPEC_')])} speculative)")
     
     save_results(results)
-    print_summary(results)
+    print_summary(results, signal_counts)
 
 
 if __name__ == "__main__":